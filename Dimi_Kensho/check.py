@@ -1,9 +1,19 @@
-import json
+import os
+import orjson
+import matplotlib
+# 화면 없이 파일로만 저장 (MPLBACKEND로 다른 백엔드를 지정한 경우는 그대로 사용)
+if 'MPLBACKEND' not in os.environ:
+    matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-from datetime import datetime
+from matplotlib.collections import LineCollection
+import numpy as np
+import pandas as pd
 import traceback
 
+# 이 개수 이상이면 레이블 없이 선/마커만 그림
+MAX_LABELED_CONTEXTS = 200
+
 class ContextVisualizer:
     def __init__(self, context_file_path: str):
         """
@@ -18,74 +28,91 @@ class ContextVisualizer:
     def _load_context_data(self) -> list:
         """context_data.json 파일을 로드합니다."""
         try:
-            with open(self.context_file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(self.context_file_path, 'rb') as f:
+                return orjson.loads(f.read())
         except Exception as e:
             print(f"컨텍스트 데이터 로드 중 오류: {str(e)}")
             return []
 
-    def visualize_timeline(self):
-        """컨텍스트의 기간을 타임라인으로 시각화합니다."""
+    def visualize_timeline(self, show: bool = False):
+        """컨텍스트의 기간을 타임라인으로 시각화합니다.
+
+        Args:
+            show (bool): True면 저장 후 창으로도 표시 (GUI 백엔드 필요)
+        """
         try:
-            # 컨텍스트 데이터 수집
-            periods = []  # 기간 데이터
-            instants = []  # 순간 데이터
+            # 컨텍스트 데이터 수집 (날짜 문자열만 모은 뒤 한 번에 파싱)
+            period_ids, start_strs, end_strs = [], [], []  # 기간 데이터
+            instant_ids, instant_strs = [], []  # 순간 데이터
             
             for context_id, context_data in self.context_data.items():
                 if context_data.get('type') == 'period':
                     start_date = context_data.get('start_date')
                     end_date = context_data.get('end_date')
                     if start_date and end_date:
-                        periods.append({
-                            'id': context_id,
-                            'start': datetime.strptime(start_date, '%Y-%m-%d'),
-                            'end': datetime.strptime(end_date, '%Y-%m-%d')
-                        })
+                        period_ids.append(context_id)
+                        start_strs.append(start_date)
+                        end_strs.append(end_date)
                 elif context_data.get('type') == 'instant':
                     date = context_data.get('date')
                     if date:
-                        instants.append({
-                            'id': context_id,
-                            'date': datetime.strptime(date, '%Y-%m-%d')
-                        })
+                        instant_ids.append(context_id)
+                        instant_strs.append(date)
             
-            if not periods and not instants:
+            if not period_ids and not instant_ids:
                 print("표시할 데이터가 없습니다.")
                 return
             
+            starts = pd.to_datetime(start_strs, format='%Y-%m-%d')
+            ends = pd.to_datetime(end_strs, format='%Y-%m-%d')
+            instant_dates = pd.to_datetime(instant_strs, format='%Y-%m-%d')
+            durations = (ends - starts).days
+            mid_points = starts + (ends - starts) / 2
+            
             # 그래프 설정
-            plt.figure(figsize=(15, 8))
+            fig, ax = plt.subplots(figsize=(15, 8))
             
-            current_y = 0  # y축 위치 카운터
+            # y축 위치: period 0..n-1, 그 다음 instant
+            period_ys = np.arange(len(period_ids))
+            instant_ys = np.arange(len(period_ids), len(period_ids) + len(instant_ids))
             
-            # 기간 데이터 표시
-            for ctx in periods:
-                plt.hlines(y=current_y, xmin=ctx['start'], xmax=ctx['end'], 
-                          linewidth=4, color='royalblue', alpha=0.7)
-                plt.plot(ctx['start'], current_y, 'o', color='royalblue', alpha=0.7)
-                plt.plot(ctx['end'], current_y, 'o', color='royalblue', alpha=0.7)
-                
-                # 기간 텍스트 표시
-                duration = (ctx['end'] - ctx['start']).days
-                mid_point = ctx['start'] + (ctx['end'] - ctx['start'])/2
-                plt.text(mid_point, current_y+0.1, f'{duration}일', 
-                        ha='center', va='bottom')
-                
-                # 컨텍스트 ID 표시
-                plt.text(ctx['start'], current_y-0.2, f'Context: {ctx["id"]} (period)', 
-                        ha='left', va='top')
-                
-                current_y += 1
+            # 기간 데이터 표시 (선 전체를 하나의 LineCollection으로)
+            if period_ids:
+                start_nums = mdates.date2num(starts.to_pydatetime())
+                end_nums = mdates.date2num(ends.to_pydatetime())
+                segments = np.stack([
+                    np.column_stack([start_nums, period_ys]),
+                    np.column_stack([end_nums, period_ys])
+                ], axis=1)
+                ax.scatter(np.concatenate([starts.to_pydatetime(), ends.to_pydatetime()]),
+                           np.concatenate([period_ys, period_ys]),
+                           marker='o', color='royalblue', alpha=0.7)
+                ax.add_collection(LineCollection(segments, linewidths=4,
+                                                 colors='royalblue', alpha=0.7))
             
             # instant 데이터 표시
-            for ctx in instants:
-                plt.plot(ctx['date'], current_y, 'D', color='red', alpha=0.7, markersize=8)
-                
-                # 컨텍스트 ID 표시
-                plt.text(ctx['date'], current_y-0.2, f'Context: {ctx["id"]} (instant)', 
-                        ha='left', va='top')
+            if instant_ids:
+                ax.scatter(instant_dates.to_pydatetime(), instant_ys,
+                           marker='D', color='red', alpha=0.7, s=64)
+            
+            ax.autoscale_view()
+            
+            # 컨텍스트가 많으면 텍스트 레이블은 생략
+            if len(period_ids) + len(instant_ids) < MAX_LABELED_CONTEXTS:
+                for y, ctx_id, start, duration, mid_point in zip(
+                        period_ys, period_ids, starts, durations, mid_points):
+                    # 기간 텍스트 표시
+                    ax.text(mid_point, y+0.1, f'{duration}일', 
+                            ha='center', va='bottom')
+                    
+                    # 컨텍스트 ID 표시
+                    ax.text(start, y-0.2, f'Context: {ctx_id} (period)', 
+                            ha='left', va='top')
                 
-                current_y += 1
+                for y, ctx_id, date in zip(instant_ys, instant_ids, instant_dates):
+                    # 컨텍스트 ID 표시
+                    ax.text(date, y-0.2, f'Context: {ctx_id} (instant)', 
+                            ha='left', va='top')
             
             # 축 설정
             plt.gca().xaxis.set_major_locator(mdates.AutoDateLocator())
@@ -113,7 +140,9 @@ class ContextVisualizer:
             
             # 저장 및 표시
             plt.savefig('context_timeline.png', dpi=300, bbox_inches='tight')
-            plt.show()
+            if show:
+                plt.show()
+            plt.close(fig)
             
         except Exception as e:
             print(f"시각화 중 오류 발생: {str(e)}")
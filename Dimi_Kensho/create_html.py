@@ -1,22 +1,32 @@
-import os
-import json
-
-def create_html_report(min_importance=5, report_mode=0):
-    """한글 구조 기반 HTML 리포트 생성"""
-    with open('Dimi_Kensho/data/structured_kr_data.json', 'r', encoding='utf-8') as f:
-        kr_data = json.load(f)
-
-    if report_mode == 1:
-        allowed_sections = ["재무상태표", "현금흐름표", "손익계산서"]
-        filtered_data = {}
-        for section, subsections in kr_data.items():
-            for keyword in allowed_sections:
-                if keyword in section:
-                    filtered_data[section] = subsections
-                    break
-        kr_data = filtered_data
-
-    html = '''
+import numpy as np
+from html import escape
+from multiprocessing import Pool
+from data_loader import load_kr_data
+
+# 이 개수 이상의 섹션이면 multiprocessing Pool로 섹션 HTML을 병렬 생성
+PARALLEL_MIN_SECTIONS = 200
+
+# 값 스케일링: 정수를 float64로 정확히 표현할 수 있는 범위와 10의 거듭제곱 표
+_MAX_EXACT_INT = 2 ** 53
+_POW10 = np.array([float(10 ** k) for k in range(23)])
+
+# report_mode=1에서 출력할 섹션 키워드
+ALLOWED_SECTIONS = ("재무상태표", "현금흐름표", "손익계산서")
+
+# 레벨별 고정 태그 (루프 안에서는 값이 들어가는 부분만 포맷팅)
+# 항목 머리 부분 템플릿 (모듈 로드 시 한 번 정의, 항목마다 format_map으로 채움)
+_ITEM_TPL = (
+    '<div class="item">'
+    '<div class="meta-info">태그: {concept}</div>'
+    '<div><strong>{korean_name}</strong></div>'
+    '<div class="meta-info">설명: {description}</div>'
+    '<div class="importance">중요도: {importance}</div>'
+)
+_VALUE_OPEN = '<div class="value-display">'
+_DIV_CLOSE = '</div>'
+
+# 리포트 상단 (스타일 포함) / 하단 고정 마크업
+_HEADER = '''
     <!DOCTYPE html>
     <html lang="ko">
     <head>
@@ -44,80 +54,142 @@ def create_html_report(min_importance=5, report_mode=0):
             </div>
     '''
 
-    for section, subsections in kr_data.items():
-        html += f'<div class="section"><h2>{section}</h2>'
-        for subsection, items in subsections.items():
-            html += f'<div class="subsection"><h3>{subsection}</h3>'
-            for item in items:
-                importance = item.get('importance_score', 0)
-                if importance >= min_importance:
-                    concept = item.get('concept', '')
-                    translation = item.get('translation', {})
-                    korean_name = translation.get('korean_name', '')
-                    description = translation.get('description', '')
-                    
-                    html += '<div class="item">'
-                    html += f'<div class="meta-info">태그: {concept}</div>'
-                    html += f'<div><strong>{korean_name}</strong></div>'
-                    html += f'<div class="meta-info">설명: {description}</div>'
-                    html += f'<div class="importance">중요도: {importance}</div>'
-                    
-                    # 데이터 값 표시 (한글 키값 사용)
-                    if 'data' in item:
-                        # 맥락별로 데이터 그룹화
-                        context_groups = {}
-                        for data_point in item['data']:
-                            context = data_point.get('맥락_분류', '기본값')
-                            if context not in context_groups:
-                                context_groups[context] = []
-                            context_groups[context].append(data_point)
-                        
-                        # 각 맥락 그룹별로 데이터 표시
-                        for context, data_points in context_groups.items():
-                            html += f'<div class="context-group"><h4>{context}</h4>'
-                            for data_point in data_points:
-                                html += '<div class="value-display">'
-                                value = data_point.get('값', '')
-                                unit = data_point.get('단위', '')
-                                decimals = data_point.get('소수점', '')
-                                members = data_point.get('멤버', [])
-                                period = data_point.get('기간', {})
-                                
-                                # 값과 단위 표시
-                                if value and unit:
-                                    if decimals and decimals.startswith('-'):
-                                        try:
-                                            value = str(int(value) / (10 ** abs(int(decimals))))
-                                        except ValueError:
-                                            pass
-                                    html += f'<div class="value">{value} {unit.upper()}</div>'
-                                
-                                # 멤버 정보 표시
-                                if members:
-                                    html += '<div class="meta-info">멤버: ' + ', '.join(members) + '</div>'
-                                
-                                # 기간 정보 표시
-                                if period:
-                                    date = period.get('date', '')
-                                    if date:
-                                        html += f'<div class="meta-info">날짜: {date}</div>'
-                                
-                                html += '</div>'
-                            html += '</div>'
-                    
-                    html += '</div>'
-            html += '</div>'
-        html += '</div>'
-
-    html += '''
+_FOOTER = '''
         </div>
     </body>
     </html>
     '''
 
+# 고정 마크업은 모듈 로드 시 한 번만 인코딩
+_HEADER_B = _HEADER.encode('utf-8')
+_FOOTER_B = _FOOTER.encode('utf-8')
+
+
+def _scaled_values(data_points):
+    """데이터 포인트들의 표시 값을 한 번에 계산합니다.
+
+    소수점(decimals)이 음수인 값은 값 / 10^|decimals|로 스케일링하며, 나눗셈은
+    NumPy 배열 연산 한 번으로 처리합니다. 숫자로 변환할 수 없는 값은 그대로 둡니다.
+    """
+    values = [data_point.get('값', '') for data_point in data_points]
+    indices, ints, exps = [], [], []
+    for i, data_point in enumerate(data_points):
+        decimals = data_point.get('소수점', '')
+        if not (values[i] and data_point.get('단위', '') and decimals and decimals.startswith('-')):
+            continue
+        try:
+            number = int(values[i])
+            exp = abs(int(decimals))
+        except ValueError:
+            continue
+        if abs(number) < _MAX_EXACT_INT and exp < len(_POW10):
+            indices.append(i)
+            ints.append(number)
+            exps.append(exp)
+        else:
+            values[i] = str(number / (10 ** exp))
+    
+    if indices:
+        scaled = np.asarray(ints, dtype=np.float64) / _POW10[exps]
+        for i, value in zip(indices, scaled.tolist()):
+            values[i] = str(value)
+    return values
+
+
+def _render_section(args):
+    """섹션 하나의 HTML 조각을 UTF-8 바이트로 생성합니다 (Pool 작업 단위)"""
+    section, subsections, min_importance, only_with_data = args
+    parts = [f'<div class="section"><h2>{escape(section)}</h2>']
+    for subsection, items in subsections.items():
+        # 중요도 미달 항목과 (옵션) 값이 없는 항목은 포맷팅 전에 제외
+        items = [
+            item for item in items
+            if item.get('importance_score', 0) >= min_importance
+            and (item.get('data') or not only_with_data)
+        ]
+        if only_with_data and not items:
+            continue
+        parts.append(f'<div class="subsection"><h3>{escape(subsection)}</h3>')
+        for item in items:
+            translation = item.get('translation', {})
+            parts.append(_ITEM_TPL.format_map({
+                'concept': escape(item.get('concept', '')),
+                'korean_name': escape(translation.get('korean_name', '')),
+                'description': escape(translation.get('description', '')),
+                'importance': item.get('importance_score', 0)
+            }))
+            
+            # 데이터 값 표시 (한글 키값 사용)
+            if 'data' in item:
+                # 맥락별로 데이터 그룹화
+                context_groups = {}
+                for data_point in item['data']:
+                    context = data_point.get('맥락_분류', '기본값')
+                    if context not in context_groups:
+                        context_groups[context] = []
+                    context_groups[context].append(data_point)
+                
+                # 각 맥락 그룹별로 데이터 표시
+                for context, data_points in context_groups.items():
+                    parts.append(f'<div class="context-group"><h4>{escape(context)}</h4>')
+                    for data_point, value in zip(data_points, _scaled_values(data_points)):
+                        parts.append(_VALUE_OPEN)
+                        unit = data_point.get('단위', '')
+                        members = data_point.get('멤버', [])
+                        period = data_point.get('기간', {})
+                        
+                        # 값과 단위 표시
+                        if value and unit:
+                            parts.append(f'<div class="value">{escape(str(value))} {escape(unit.upper())}</div>')
+                        
+                        # 멤버 정보 표시
+                        if members:
+                            parts.append('<div class="meta-info">멤버: ' + escape(', '.join(members)) + '</div>')
+                        
+                        # 기간 정보 표시
+                        if period:
+                            date = period.get('date', '')
+                            if date:
+                                parts.append(f'<div class="meta-info">날짜: {escape(date)}</div>')
+                        
+                        parts.append(_DIV_CLOSE)
+                    parts.append(_DIV_CLOSE)
+            
+            parts.append(_DIV_CLOSE)
+        parts.append(_DIV_CLOSE)
+    # 표시할 항목이 하나도 없는 섹션은 생략
+    if only_with_data and len(parts) == 1:
+        return b''
+    parts.append(_DIV_CLOSE)
+    # 워커에서 바로 UTF-8로 인코딩해서 메인 프로세스는 바이트를 그대로 기록
+    return ''.join(parts).encode('utf-8')
+
+
+def create_html_report(min_importance=5, report_mode=0, only_with_data=True):
+    """한글 구조 기반 HTML 리포트 생성
+
+    only_with_data가 True면 값(data)이 없는 항목과 비어 있는 그룹/섹션은 출력하지 않습니다.
+    """
+    kr_data = load_kr_data('Dimi_Kensho/data/structured_kr_data.json')
+
+    # report_mode 1이면 주요 재무제표 섹션만 (별도 dict를 만들지 않고 작업 목록을 만들 때 거름)
+    tasks = [
+        (section, subsections, min_importance, only_with_data)
+        for section, subsections in kr_data.items()
+        if report_mode != 1 or any(keyword in section for keyword in ALLOWED_SECTIONS)
+    ]
+
+    # 전체 HTML 문자열을 만들지 않고 섹션 조각을 생성되는 대로 파일에 기록
     output_file = 'Dimi_Kensho/data/xbrl_visualization_kr.html'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    with open(output_file, 'wb', buffering=1 << 20) as f:
+        f.write(_HEADER_B)
+        # 섹션 수가 적으면 프로세스 생성/전송 비용이 더 크므로 순차 처리
+        if len(tasks) >= PARALLEL_MIN_SECTIONS:
+            with Pool() as pool:
+                f.writelines(pool.imap(_render_section, tasks))
+        else:
+            f.writelines(map(_render_section, tasks))
+        f.write(_FOOTER_B)
     
     print(f"\nHTML 리포트가 생성되었습니다: {output_file}")
 
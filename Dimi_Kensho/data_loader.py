@@ -0,0 +1,28 @@
+import os
+from functools import lru_cache
+
+import orjson
+
+KR_DATA_FILE = 'Dimi_Kensho/data/structured_kr_data.json'
+
+
+@lru_cache(maxsize=4)
+def _load_kr_data_cached(path, mtime_ns, size):
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def load_kr_data(path: str = KR_DATA_FILE) -> dict:
+    """structured_kr_data.json을 한 번만 파싱해서 같은 프로세스 안에서 공유합니다.
+
+    파일의 수정 시각/크기가 바뀌면 다시 읽습니다. 반환된 dict는 여러 곳에서
+    같이 사용하므로 호출하는 쪽에서 수정하지 않아야 합니다.
+
+    Args:
+        path (str): 한글 구조화 데이터 JSON 경로
+
+    Returns:
+        dict: 섹션 → 그룹 → 항목 리스트
+    """
+    stat = os.stat(path)
+    return _load_kr_data_cached(path, stat.st_mtime_ns, stat.st_size)
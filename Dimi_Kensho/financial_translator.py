@@ -1,386 +1,967 @@
-import json
+import orjson
+import ijson
 import os
 from typing import Dict, List, Optional
 import openai
-from datetime import datetime, timedelta
+import httpx
+import numpy as np
 import traceback
 import os
 from dotenv import load_dotenv
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 import re
-from collections import Counter
+import hashlib
+import sqlite3
+import time
+import logging
+import mmap
+import importlib.util
+from itertools import chain
+from functools import partial
+from pydantic import ValidationError
+from tenacity import AsyncRetrying, stop_after_attempt, wait_random_exponential, retry_if_exception_type
+
+from llm_schemas import ChunkTranslations, SectionTranslations, response_format
+from utils import remove_namespace
 
 load_dotenv()
 
+# 프롬프트/응답 원문, 컨텍스트 ID 목록 등 상세 출력은 DEBUG 레벨에서만 기록
+log = logging.getLogger(__name__)
+
+# LLM 호출 한 번에 넣을 태그 행/멤버 수 (태그 행마다 멤버를 함께 넣어 한 번에 번역)
+TAG_BATCH_SIZE = 50
+MEMBER_BATCH_SIZE = 50
+# 동시에 진행할 LLM 요청 수 상한 (요청 한도 초과 방지)
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "20"))
+# AsyncOpenAI 클라이언트 설정 (keep-alive 연결 풀을 동시 요청 수만큼 유지)
+LLM_TIMEOUT = 30
+LLM_MAX_CONNECTIONS = LLM_CONCURRENCY
+# httpx의 HTTP/2 지원은 h2 패키지(httpx[http2])가 있어야 동작하므로 없으면 HTTP/1.1 사용
+LLM_HTTP2 = importlib.util.find_spec("h2") is not None
+# 요청 한도 초과(429)/연결·시간 초과/서버 오류(5xx) 시 지수 백오프로 재시도 (첫 시도 포함 횟수)
+# 400/401 등 요청 자체의 오류는 재시도하지 않고 바로 실패
+LLM_MAX_ATTEMPTS = 6
+LLM_MAX_RETRY_WAIT = 60
+_RETRYABLE_LLM_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+# 다시 보내도 같은 결과인 오류 (키/권한/모델/요청 형식). 한 번 나면 남은 요청을 보내지 않고 실행을 중단
+_FATAL_LLM_ERRORS = (openai.AuthenticationError, openai.PermissionDeniedError,
+                     openai.BadRequestError, openai.NotFoundError)
+# 계정의 분당 요청/토큰 한도 (0이면 제한 없음). 한도에 닿기 전에 요청을 미리 늦춤
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "0"))
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "0"))
+# 응답 토큰 상한 (응답에 다시 나오는 이름 길이 + 항목당 토큰 + 여유분, 최대 LLM_MAX_OUTPUT_TOKENS)
+# 최대값은 gpt-4o/gpt-4o-mini의 최대 출력 토큰. 잘리거나 형식이 틀린 응답은 상한을 두 배로 늘려 다시 요청
+LLM_MAX_OUTPUT_TOKENS = 16384
+LLM_OUTPUT_TOKEN_MARGIN = 256
+# 응답 항목 하나에 이름 외에 드는 토큰 (JSON 키/구두점 + 한국어 번역, 태그 행은 중요도 포함)
+CHUNK_TOKENS_PER_ITEM = 45
+SECTION_TOKENS_PER_ITEM = 35
+# 잘리거나 항목이 빠진 응답을 나눠서/다시 요청하는 횟수의 실행당 상한 (넘으면 남은 항목은 기본값 사용)
+LLM_MAX_REREQUESTS = 100
+# Batch API (use_batch_api=True) 상태 확인 간격 (초, 지수적으로 늘림)
+BATCH_POLL_MIN_INTERVAL = 10
+BATCH_POLL_MAX_INTERVAL = 300
+_BATCH_FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+# 실행 간에 번역 결과를 재사용하는 SQLite 캐시 파일 (data_dir 기준)
+TRANSLATION_CACHE_FILE = "translation_cache.sqlite"
+# 태그 임베딩 기반 의미 캐시 (semantic_cache=True일 때만 사용)
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH_SIZE = 1000
+SEMANTIC_CACHE_THRESHOLD = 0.92
+TAG_EMBEDDINGS_FILE = "tag_embeddings.npy"
+TAG_EMBEDDING_KEYS_FILE = "tag_embedding_keys.json"
+
+# LLM 호출별 시스템 메시지 (메시지 dict도 미리 만들어 두고 매 호출마다 재사용)
+SYS_CHUNK = "한국 K-IFRS 용어로 재무제표 항목과 멤버 이름을 번역하는 전문가입니다."
+SYS_SECTIONS = "재무제표 섹션 이름을 한국어로 번역하는 전문가입니다."
+_SYSTEM_MESSAGES = {
+    msg: {"role": "system", "content": msg}
+    for msg in (SYS_CHUNK, SYS_SECTIONS)
+}
+
+# 태그/멤버 통합 번역 요청의 고정된 지시문 (뒤에 태그 행 JSON을 붙임)
+# 요청마다 앞부분이 같으므로 API의 프롬프트 캐시도 적중하기 쉬움
+CHUNK_PROMPT = """다음 재무제표 항목(태그) 행마다 태그를 한국어로 번역하고 중요도 점수를 매겨주세요. 각 행의 members에 있는 세그먼트(부문) 및 멤버 이름들도 한국어로 번역해주세요.
+
+투자자에게 중요한 정보가 될수록 높은 점수를 매겨 1~5점까지 중요도 점수를 매겨주세요.
+
+태그 번역 규칙:
+1. 한국 K-IFRS 기준의 공식 용어를 우선적으로 사용
+2. 공식 용어가 없는 경우, 한국 재무제표에서 일반적으로 사용되는 직관적인 용어로 번역
+3. 번역시 다음 용어들은 일관되게 사용:
+   - Revenue → 매출액
+   - Cost of Revenue/Sales → 매출원가
+   - Gross Profit → 매출총이익
+   - Operating Income/Loss → 영업이익/손실
+   - Net Income/Loss → 당기순이익/손실
+4. 번역문은 간단명료하게, 불필요한 설명이나 수식어 제외
+5. 기술적인 용어는 한국 투자자들이 이해하기 쉬운 용어로 번역
+
+멤버 번역 규칙:
+1. 세그먼트/부문 관련:
+   - XXXSegmentMember → "XX 부문"으로 번역 (예: AsiaSegmentMember → "아시아 부문")
+   - 지역 세그먼트는 일반적인 한국어 지역명 사용 (예: GreaterChina → "대중화권")
+   - Product/Service는 "제품"/"서비스"로 번역
+2. 일반 멤버 관련:
+   - Member 접미사는 번역하지 않고 제외
+   - 일반적인 재무용어는 한국 회계기준 용어 사용
+   - 제품명이나 브랜드명은 한국에서 통용되는 명칭 사용
+3. 멤버가 속한 태그의 맥락을 고려하여 자연스러운 번역
+
+번역할 태그와 멤버:
+"""
+
+# 주요 재무제표 섹션의 표준 용어 (소문자 영문 → 한국어)
+_STANDARD_SECTION_NAMES = {
+    'balance sheet': '재무상태표',
+    'statement of financial position': '재무상태표',
+    'income statement': '포괄손익계산서',
+    'statement of comprehensive income': '포괄손익계산서',
+    'profit and loss': '포괄손익계산서',
+    'cash flow': '현금흐름표',
+    'statement of cash flows': '현금흐름표'
+}
+
+# 기간 정보가 없는 데이터 포인트 / 번역이 없는 태그에 쓰는 빈 dict (매번 새로 만들지 않음)
+_EMPTY_PERIOD = {}
+_EMPTY_TRANSLATION = {}
+
+# json_object 모드가 아닌 응답에서 <json>...</json> 블록을 찾는 패턴
+_JSON_BLOCK_RE = re.compile(r'<json>\s*(.*?)\s*</json>', re.DOTALL)
+
+class _RateLimiter:
+    """분당 요청 수(RPM)와 토큰 수(TPM)를 함께 제한하는 토큰 버킷
+
+    버킷은 시간에 비례해 최대 한도까지 채워지고, 요청마다 1개 요청과 예상 토큰 수만큼
+    꺼내 씁니다. 부족하면 채워질 때까지 기다립니다.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last
+        self._last = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int) -> None:
+        """요청 하나와 tokens만큼의 한도가 생길 때까지 기다린 뒤 차감합니다."""
+        if self.tpm:
+            tokens = min(tokens, self.tpm)
+        # 먼저 온 요청부터 순서대로 한도를 받도록 대기 구간 전체를 잠금
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.rpm and self._requests < 1:
+                    wait = (1 - self._requests) * 60 / self.rpm
+                if self.tpm and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= tokens
+
+
+_retry_backoff = wait_random_exponential(min=1, max=LLM_MAX_RETRY_WAIT)
+
+
+def _retry_wait(retry_state) -> float:
+    """재시도 대기 시간 (응답에 Retry-After가 있으면 그 값을, 없으면 지터가 있는 지수 백오프)"""
+    response = getattr(retry_state.outcome.exception(), 'response', None)
+    if response is not None:
+        headers = response.headers
+        try:
+            if 'retry-after-ms' in headers:
+                return min(float(headers['retry-after-ms']) / 1000, LLM_MAX_RETRY_WAIT)
+            if 'retry-after' in headers:
+                return min(float(headers['retry-after']), LLM_MAX_RETRY_WAIT)
+        except ValueError:
+            pass  # HTTP 날짜 형식 등은 백오프로 대체
+    return _retry_backoff(retry_state)
+
+
+def _estimate_tokens(messages: list, max_tokens: Optional[int]) -> int:
+    """요청 하나가 쓸 토큰 수를 대략 계산합니다. (한글/영문이 섞인 프롬프트 기준 2글자당 1토큰 + 응답 상한)"""
+    prompt_chars = sum(len(message["content"]) for message in messages)
+    return prompt_chars // 2 + (max_tokens or LLM_OUTPUT_TOKEN_MARGIN)
+
+
+def _system_message(system_msg: str) -> dict:
+    """시스템 메시지 dict (상수 메시지는 미리 만든 것을 반환)"""
+    return _SYSTEM_MESSAGES.get(system_msg) or {"role": "system", "content": system_msg}
+
+
+def _unique_preserving_order(seq) -> list:
+    """등장 순서를 유지하면서 중복을 제거합니다."""
+    return list(dict.fromkeys(seq))
+
+
+def _output_token_budget(names, tokens_per_item: int) -> int:
+    """응답에 그대로 다시 나오는 이름들로 max_tokens 값을 계산합니다.
+
+    strict 스키마 응답은 항목마다 태그/멤버/섹션 이름 전체를 다시 쓰므로, 영문 이름은
+    3글자당 1토큰으로 어림잡고 항목마다 JSON 키와 한국어 번역 몫(tokens_per_item)을 더합니다.
+    """
+    names = list(names)
+    echoed = sum(len(name) for name in names) // 3
+    return min(echoed + tokens_per_item * len(names) + LLM_OUTPUT_TOKEN_MARGIN, LLM_MAX_OUTPUT_TOKENS)
+
+
+def _parse_dates(values: list) -> np.ndarray:
+    """'YYYY-MM-DD' 문자열 리스트를 datetime64[D] 배열로 한 번에 변환합니다. 변환할 수 없는 값은 NaT."""
+    try:
+        return np.array(values, dtype='datetime64[D]')
+    except (ValueError, TypeError):
+        # 잘못된 값이 섞여 있으면 해당 값만 NaT로 처리
+        parsed = np.empty(len(values), dtype='datetime64[D]')
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = np.datetime64(value, 'D')
+            except (ValueError, TypeError):
+                parsed[i] = np.datetime64('NaT')
+        return parsed
+
 class FinancialTranslator:
-    def __init__(self, data_dir: str, model: str = "gpt-4o-mini"):
+    def __init__(self, data_dir: str, model: str = "gpt-4o-mini", semantic_cache: bool = False,
+                 use_batch_api: bool = False):
+        """
+        Args:
+            data_dir (str): hierarchy.json 등이 있는 데이터 디렉토리
+            model (str): 번역에 사용할 OpenAI 모델
+            semantic_cache (bool): True면 번역 요청 전에 태그 임베딩으로 의미가 거의 같은
+                기존 태그를 찾아 번역을 재사용 (Current/Noncurrent처럼 이름이 비슷한 태그가
+                같은 번역을 받을 수 있으므로 기본값은 꺼짐)
+            use_batch_api (bool): True면 번역 요청을 OpenAI Batch API로 묶어 제출
+                (비용 절반, 대신 완료까지 최대 24시간 걸릴 수 있음)
+        """
         self.data_dir = data_dir
         self.model = model
-        self.hierarchy_data = None
+        self.semantic_cache = semantic_cache
+        self.use_batch_api = use_batch_api
         self.translated_data = {}
         self.tag_translations_cache = {}
         self.member_translations_cache = {}
-        self.context_categories_cache = {}
         self.section_translations_cache = {}
+        self._aclient = None
+        self._sem = None
+        self._limiter = None
+        # 실행 중 처음 발생한 _FATAL_LLM_ERRORS 오류 (있으면 이후 요청을 보내지 않음)
+        self._llm_error = None
+        self._rerequests_left = LLM_MAX_REREQUESTS
+        self._cache_db = self._open_translation_cache()
+        # 의미 캐시: 정규화된 태그 임베딩 (N, dim)과 각 행의 {"tag", "translation"}
+        self._tag_embeddings = None
+        self._tag_embedding_entries = []
+        if semantic_cache:
+            self._load_semantic_cache()
+
+    @property
+    def aclient(self):
+        """AsyncOpenAI 클라이언트 (이벤트 루프 안에서 처음 사용할 때 한 번만 생성해서 재사용)"""
+        if self._aclient is None:
+            if not LLM_HTTP2:
+                print("h2 패키지가 없어 HTTP/1.1로 연결합니다. (pip install 'httpx[http2]')")
+            self._aclient = openai.AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                timeout=LLM_TIMEOUT,
+                max_retries=0,  # 재시도는 _create_completion에서 직접 처리
+                # HTTP/2로 동시 요청을 적은 수의 연결에 다중화 (TLS 핸드셰이크 감소)
+                http_client=httpx.AsyncClient(http2=LLM_HTTP2, limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS
+                ))
+            )
+        return self._aclient
+
+    @property
+    def sem(self) -> asyncio.Semaphore:
+        """동시 LLM 요청 수를 LLM_CONCURRENCY로 제한하는 세마포어 (클라이언트와 같은 루프에서 생성)"""
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(LLM_CONCURRENCY)
+        return self._sem
+
+    @property
+    def limiter(self) -> Optional[_RateLimiter]:
+        """LLM_RPM_LIMIT/LLM_TPM_LIMIT가 설정된 경우에만 사용하는 요청 속도 제한기"""
+        if self._limiter is None and (LLM_RPM_LIMIT or LLM_TPM_LIMIT):
+            self._limiter = _RateLimiter(LLM_RPM_LIMIT, LLM_TPM_LIMIT)
+        return self._limiter
+
+    async def _close_client(self) -> None:
+        """이벤트 루프가 끝나기 전에 비동기 클라이언트 연결을 닫습니다."""
+        if self._aclient is not None:
+            await self._aclient.close()
+            self._aclient = None
+        self._sem = None
+        self._limiter = None
     
-    def remove_namespace(self, tag):
-        """태그에서 네임스페이스 제거 및 정제
-        
-        Args:
-            tag (str): 원본 태그
-            
-        Returns:
-            str: 정제된 태그 이름
+    def _open_translation_cache(self):
+        """번역 결과를 저장하는 SQLite 캐시를 엽니다. 실패하면 캐시 없이 동작합니다."""
+        try:
+            conn = sqlite3.connect(
+                os.path.join(self.data_dir, TRANSLATION_CACHE_FILE),
+                check_same_thread=False
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, json TEXT)")
+            return conn
+        except sqlite3.Error as e:
+            print(f"번역 캐시를 열 수 없습니다: {str(e)}")
+            return None
+
+    def _close_translation_cache(self) -> None:
+        """SQLite 번역 캐시 연결을 닫습니다. (다음 translate_recent_statements에서 다시 엶)"""
+        if self._cache_db is not None:
+            self._cache_db.close()
+            self._cache_db = None
+
+    def _cache_key(self, kind: str, name: str) -> str:
+        """모델/종류/정규화된 이름으로 캐시 키를 만듭니다."""
+        if kind == 'tag':
+            name = remove_namespace(name)
+        elif kind == 'member':
+            name = self._member_stem(name)
+        elif kind == 'section':
+            name = name.lower()
+        return hashlib.sha1(f"{self.model}|{kind}|{name}".encode('utf-8')).hexdigest()
+
+    def _load_cached_translations(self, kind: str, names: list, cache: dict) -> list:
+        """영구 캐시에 있는 번역을 메모리 캐시에 채우고, 캐시에 없는 이름만 반환합니다."""
+        if self._cache_db is None or not names:
+            return names
+        keys = {self._cache_key(kind, name): name for name in names}
+        key_list = list(keys)
+        try:
+            # SQLite 바인딩 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i:i + 500]
+                rows = self._cache_db.execute(
+                    f"SELECT key, json FROM translations WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                for key, value in rows:
+                    cache[keys[key]] = orjson.loads(value)
+        except sqlite3.Error as e:
+            print(f"번역 캐시 조회 중 오류: {str(e)}")
+        return [name for name in names if name not in cache]
+
+    def _store_cached_translations(self, kind: str, translations: dict) -> None:
+        """새로 받은 번역을 영구 캐시에 저장합니다."""
+        if self._cache_db is None or not translations:
+            return
+        try:
+            with self._cache_db:
+                self._cache_db.executemany(
+                    "INSERT OR REPLACE INTO translations (key, json) VALUES (?, ?)",
+                    [(self._cache_key(kind, name), orjson.dumps(value).decode())
+                     for name, value in translations.items()]
+                )
+        except sqlite3.Error as e:
+            print(f"번역 캐시 저장 중 오류: {str(e)}")
+
+    def _member_stem(self, member: str) -> str:
+        """네임스페이스와 Member 접미사를 뗀 멤버 이름 (같은 멤버의 표기 차이를 하나로 묶음)"""
+        stem = remove_namespace(member)
+        if stem.endswith('member') and len(stem) > len('member'):
+            stem = stem[:-len('member')]
+        return stem
+
+    def _hierarchy_file(self) -> str:
+        """hierarchy.json 경로"""
+        return os.path.join(self.data_dir, "hierarchy.json")
+
+    def _iter_sections(self):
+        """hierarchy.json을 스트리밍하며 (섹션, 섹션 데이터) 쌍을 하나씩 반환합니다.
+
+        최상위 dict 전체를 메모리에 올리지 않고 한 번에 한 섹션만 파싱합니다.
         """
-        # 네임스페이스 패턴 정의
-        ns_patterns = {
-            'standard': ['us-gaap', 'usgaap', 'us', 'gaap', 'dei', 'srt'],
-            'international': ['ifrs', 'country', 'currency'],
-            'other': ['invest', 'risk', 'ref', 'ecd']
+        with open(self._hierarchy_file(), 'rb') as f:
+            # use_float: 일반 JSON 파서와 같이 숫자를 Decimal 대신 int/float로 읽음
+            yield from ijson.kvitems(f, '', use_float=True)
+
+    def _completion_body(self, messages: list, max_tokens: Optional[int] = None,
+                         schema: Optional[type] = None) -> dict:
+        """chat.completions 요청 본문 (실시간 호출과 Batch API 요청에서 같이 사용)
+
+        schema(llm_schemas의 pydantic 모델)가 있으면 strict json_schema로 응답 구조를 강제하고,
+        없으면 json_object 모드를 사용합니다.
+        """
+        body = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.1,
+            "response_format": response_format(schema) if schema else {"type": "json_object"}
         }
-        
-        # 1. 콜론(:)으로 분리된 네임스페이스 처리
-        if ':' in tag:
-            ns, name = tag.split(':', 1)
-            return name.lower()
-        
-        # 2. 언더스코어(_)로 분리된 네임스페이스 처리
-        if '_' in tag:
-            parts = tag.split('_', 1)
-            for category, patterns in ns_patterns.items():
-                if parts[0].lower() in patterns:
-                    return parts[1].lower()
-        
-        # 3. 하이픈(-)으로 분리된 네임스페이스 처리
-        if '-' in tag:
-            parts = tag.split('-', 1)
-            if parts[0].lower() in ns_patterns['standard']:
-                return parts[1].lower()
-        
-        return tag.lower()
+        if max_tokens is not None:
+            body["max_tokens"] = max_tokens
+        return body
 
-    def _load_hierarchy(self) -> dict:
-        """계층 구조 데이터를 로드합니다."""
-        try:
-            file_path = f"{self.data_dir}\hierarchy.json"
-            print(f"데이터 파일 경로: {file_path}")
-            if not os.path.exists(file_path):
+    async def _request_with_retry(self, create, tokens: int, **kwargs):
+        """OpenAI API 요청 하나를 보냅니다. (chat/embeddings 공통)
 
-                print(f"파일이 존재하지 않습니다: {file_path}")
-                return {}
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"데이터 로드 중 오류: {str(e)}")
-            traceback.print_exc()
-            return {}
+        요청 한도 초과/연결·시간 초과/서버 오류만 최대 LLM_MAX_ATTEMPTS번 시도합니다.
+        Retry-After 헤더가 있으면 그만큼 기다리고, 없으면 지수 백오프(지터 포함)로 기다립니다.
+        RPM/TPM 한도가 설정되어 있으면 시도마다 먼저 tokens만큼 한도를 확보합니다.
+        """
+        limiter = self.limiter
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(LLM_MAX_ATTEMPTS),
+            wait=_retry_wait,
+            retry=retry_if_exception_type(_RETRYABLE_LLM_ERRORS),
+            reraise=True
+        ):
+            with attempt:
+                if limiter:
+                    await limiter.acquire(tokens)
+                response = await create(**kwargs)
+        return response
+
+    async def _create_completion(self, messages: list, max_tokens: Optional[int] = None,
+                                 schema: Optional[type] = None) -> str:
+        """chat.completions.create를 호출하고 응답 본문을 반환합니다. (재시도/한도는 _request_with_retry)"""
+        tokens = _estimate_tokens(messages, max_tokens) if self.limiter else 0
+        response = await self._request_with_retry(
+            self.aclient.chat.completions.create, tokens,
+            **self._completion_body(messages, max_tokens, schema)
+        )
+        content = response.choices[0].message.content
+        log.debug("LLM 원본 응답: %s", content)
+        return content
 
-    def _call_llm(self, prompt: str, system_msg: str) -> dict:
-        """최신 openai API 인터페이스를 사용하여 LLM을 호출합니다."""
+    def _parse_llm_json(self, content: str, schema: Optional[type] = None) -> Optional[dict]:
+        """LLM 응답을 dict로 파싱합니다. 실패하면 None.
+
+        schema가 있으면 pydantic으로 검증한 뒤 schema.to_result()의 dict 형태로 반환합니다.
+        """
+        if content is None:
+            # 거절 응답 등으로 본문이 없는 경우
+            return None
+        if schema is not None:
+            try:
+                return schema.model_validate_json(content).to_result()
+            except ValidationError as e:
+                print(f"응답 스키마 검증 오류: {e.error_count()}개 항목")
+                return None
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            # JSON 파싱 시도 (json_object 모드라 보통 바로 성공)
+            result = orjson.loads(content)
+        except orjson.JSONDecodeError as e:
+            print(f"JSON 파싱 오류: {str(e)}")
+            # JSON 형식이 아닌 경우, <json> 태그 찾기 시도
+            result = None
+            # 태그가 없으면 정규식 탐색 자체를 건너뜀
+            match = _JSON_BLOCK_RE.search(content) if '<json>' in content else None
+            if match:
+                try:
+                    result = orjson.loads(match.group(1))
+                except orjson.JSONDecodeError:
+                    print("JSON 태그 내용 파싱 실패")
+        
+        # 호출하는 쪽은 항상 dict를 기대하므로 최상위가 객체가 아니면 버림
+        return result if isinstance(result, dict) else None
+
+    async def _call_llm(self, prompt: str, system_msg: str, max_tokens: Optional[int] = None,
+                        schema: Optional[type] = None) -> dict:
+        """AsyncOpenAI로 LLM을 호출합니다. (여러 호출을 asyncio.gather로 동시에 실행)
+
+        Args:
+            prompt (str): 사용자 프롬프트
+            system_msg (str): 시스템 메시지
+            max_tokens (Optional[int]): 응답 토큰 상한 (None이면 모델 기본값)
+            schema (Optional[type]): 응답 구조를 강제할 llm_schemas 모델
 
+        Returns:
+            dict: 파싱된 응답. 응답이 비었거나 형식이 틀리면 {}, 요청 자체가 실패하면 None
+
+        Raises:
+            _FATAL_LLM_ERRORS: 인증/권한/잘못된 요청 오류 (이후 호출도 보내지 않고 같은 오류를 냄)
+        """
+        try:
             messages = [
-                {"role": "system", "content": system_msg},
+                _system_message(system_msg),
                 {"role": "user", "content": prompt}
             ]
             
-            print(f"LLM 요청 - System: {system_msg}")  # 디버깅용
-            print(f"LLM 요청 - Prompt: {prompt}")  # 디버깅용
+            log.debug("LLM 요청 - System: %s", system_msg)
+            log.debug("LLM 요청 - Prompt: %s", prompt)
             
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.1,
-                response_format={"type": "json_object"}  # JSON 응답 형식 강제
-            )
-            content = response.choices[0].message.content
-            print(f"LLM 원본 응답: {content}")  # 디버깅용
-
-            try:
-                # JSON 파싱 시도
-                return json.loads(content)
-            except json.JSONDecodeError as e:
-                print(f"JSON 파싱 오류: {str(e)}")
-                # JSON 형식이 아닌 경우, <json> 태그 찾기 시도
-                match = re.search(r'<json>\s*(.*?)\s*</json>', content, re.DOTALL)
-                if match:
-                    try:
-                        return json.loads(match.group(1))
-                    except json.JSONDecodeError:
-                        print("JSON 태그 내용 파싱 실패")
-                
-                print("기본 번역으로 대체됩니다.")
-                return {}
+            async with self.sem:
+                if self._llm_error is not None:
+                    raise self._llm_error
+                result = self._parse_llm_json(
+                    await self._create_completion(messages, max_tokens, schema), schema
+                )
+                if result is None:
+                    # 응답 형식 오류는 백오프 재시도 대신 한 번만 다시 요청
+                    # (max_tokens에서 잘린 응답일 수 있으므로 상한을 두 배로 늘림)
+                    if max_tokens is not None:
+                        max_tokens = min(max_tokens * 2, LLM_MAX_OUTPUT_TOKENS)
+                    print(f"JSON 응답을 다시 요청합니다. (max_tokens={max_tokens})")
+                    result = self._parse_llm_json(
+                        await self._create_completion(messages, max_tokens, schema), schema
+                    )
             
+            if result is not None:
+                return result
+            print("기본 번역으로 대체됩니다.")
+            return {}
+            
+        except _FATAL_LLM_ERRORS as e:
+            self._set_fatal_error(e)
+            raise
         except Exception as e:
             print(f"LLM 호출 중 오류: {str(e)}")
             traceback.print_exc()
-            return {}
+            return None
 
-    def _translate_member_names_batch(self, all_members: list) -> dict:
-        """멤버 이름들을 배치 처리하여 번역합니다."""
-        seen = set()
-        unique_members = []
-        for m in all_members:
-            if m and m not in seen:
-                seen.add(m)
-                unique_members.append(m)
-        if unique_members:
-            batch_size = 100
-            for i in range(0, len(unique_members), batch_size):
-                batch = unique_members[i:i+batch_size]
-                prompt = (
-                    "다음 재무제표 멤버 이름들을 한국어로 번역해주세요. 한국 K-IFRS 기준의 직관적인 용어를 사용합니다. 뒤에 멤버라는 것은 제외하고 앞의 이름만 한국어로 쉽게 바꿔주세요.\n"
-                    "응답은 반드시 아래 JSON 형식으로 작성해주세요:\n\n"
-                    "<json>\n"
-                    '{ "translations": { "member1": "번역1" } }\n'
-                    "</json>\n\n"
-                    f"멤버 이름들:\n{json.dumps(batch, ensure_ascii=False, indent=2)}"
-                )
-                system_msg = "재무제표 멤버 이름을 번역하는 전문가입니다."
-                result = self._call_llm(prompt, system_msg)
-                new_translations = result.get('translations', {})
-                self.member_translations_cache.update(new_translations)
-                print(f"멤버 번역 완료: {len(batch)}개 처리 (배치 처리)")
-        return {m: self.member_translations_cache.get(m, m) for m in all_members}
-
-    def _analyze_data_contexts_batch(self, tag_members_map: dict) -> dict:
-        """태그별 멤버 정보를 기반으로 맥락(카테고리)을 분석합니다."""
-        if not tag_members_map:
-            return {}
-        uncached_tags = {tag: members for tag, members in tag_members_map.items()
-                         if tag not in self.context_categories_cache}
-        if uncached_tags:
-            prompt = (
-                "다음 재무제표 태그들과 관련 멤버 리스트를 분석하여, 각 태그에 대해 일관된 맥락(카테고리)를 결정해주세요.\n"
-                "응답은 아래 JSON 형식으로 작성해주세요:\n\n"
-                "<json>\n"
-                '{ "contexts": [ {"tag": "tag1", "category": "맥락 분류1"} ] }\n'
-                "</json>\n"
-                "분석할 태그와 멤버 리스트 정보:\n"
+    def _set_fatal_error(self, error: Exception) -> None:
+        """처음 발생한 복구할 수 없는 LLM 오류를 기록합니다. (이후 요청은 보내지 않음)"""
+        if self._llm_error is None:
+            print(f"LLM 요청을 중단합니다 (다시 보내도 실패하는 오류): {str(error)}")
+            self._llm_error = error
 
-            )
-            items = []
-            for tag, members_lists in uncached_tags.items():
-                items.append({"tag": tag, "members_lists": members_lists})
-            prompt += json.dumps(items, ensure_ascii=False, indent=2)
-            system_msg = "재무제표 데이터의 맥락을 분석하는 전문가입니다."
-            result = self._call_llm(prompt, system_msg)
-            for context in result.get("contexts", []):
-                tag = context.get("tag")
-                category = context.get("category", "")
-                if tag:
-                    self.context_categories_cache[tag] = category
-            print(f"맥락 분석 완료: {len(uncached_tags)}개 태그 (배치 처리)")
-        return {tag: self.context_categories_cache.get(tag, "") for tag in tag_members_map.keys()}
-
-    def _translate_members(self, members: list, tag_name: str, tag_translation: str) -> dict:
-        """
-        멤버 리스트를 번역합니다.
-        태그 이름과 번역을 컨텍스트로 제공하여 더 자연스러운 번역을 유도합니다.
-        """
-        if not members:
-            return {}
+    async def _call_llm_many(self, requests: list) -> list:
+        """여러 LLM 요청을 처리하고 요청 순서대로 결과 dict 리스트를 반환합니다.
 
-        members_prompt = f"""다음 재무제표 항목의 멤버들을 한국어로 번역해주세요.
-        
-        항목 정보:
-        - 태그 이름: {tag_name}
-        - 태그 번역: {tag_translation}
-        
-        다음 규칙을 반드시 따라주세요:
-        1. 위 태그의 맥락을 고려하여 자연스러운 한국어 용어로 번역
-        2. 한국 재무제표에서 일반적으로 사용되는 용어를 사용
-        3. 직관적이고 이해하기 쉬운 용어로 번역
-        4. 불필요한 설명이나 수식어는 제외
-        5. 기술적인 용어는 한국 투자자들이 이해하기 쉬운 용어로 번역
-        
-        번역할 멤버:
-        {members}
+        Args:
+            requests (list): (prompt, system_msg, max_tokens, schema) 튜플 리스트
+
+        use_batch_api면 Batch API 작업 하나로 제출하고, 아니면 동시에 호출합니다.
         """
-        
-        translations = self._translate_text_batch(members_prompt)
-        return dict(zip(members, translations))
+        if not requests:
+            return []
+        if self.use_batch_api:
+            return await self._call_llm_batch_api(requests)
+        return await asyncio.gather(*(self._call_llm(*request) for request in requests))
 
-    def _translate_members_batch(self, members_info: list) -> dict:
-        """멤버 이름들을 배치로 번역합니다."""
-        translations = {}
-        
-        # 입력이 딕셔너리인 경우 처리
-        if isinstance(members_info, dict):
-            members_info = [members_info]
-        
-        # 배치 크기 설정
-        BATCH_SIZE = 50
-        
-        # 멤버와 태그 정보를 함께 모음
-        all_members_with_context = []
-        for member_dict in members_info:
-            try:
-                if not isinstance(member_dict, dict):
-                    print(f"잘못된 입력 형식 무시: {member_dict}")
+    async def _call_llm_until_complete(self, groups: list, make_request, accept) -> list:
+        """항목 묶음마다 요청하고, 응답에 빠진 항목은 다시 요청합니다.
+
+        일부만 빠졌으면 빠진 항목만 묶어 다시 요청하고, 전부 빠졌으면(응답 잘림/검증 실패 등)
+        묶음을 반으로 나눠 다시 요청합니다. 항목 하나만 보냈는데도 빠지면 포기합니다.
+        요청 자체가 실패한 묶음(재시도 소진 등)은 나눠도 같으므로 다시 요청하지 않고,
+        다시 보내는 요청 수는 실행당 LLM_MAX_REREQUESTS개로 제한합니다.
+
+        Args:
+            groups (list): 요청 하나에 넣을 항목 리스트들
+            make_request: 항목 리스트 → _call_llm_many에 넘길 요청 튜플
+            accept: (항목 리스트, 응답 dict) → 응답에 없던 항목 리스트 (받은 결과는 여기서 저장)
+
+        Returns:
+            list: 끝내 번역하지 못한 항목
+        """
+        dropped = []
+        pending = [group for group in groups if group]
+        while pending:
+            results = await self._call_llm_many([make_request(group) for group in pending])
+            retry = []
+            for group, result in zip(pending, results):
+                if result is None:
+                    dropped.extend(group)
                     continue
-                    
-                tag_name = member_dict.get('tag_name', '')
-                tag_translation = member_dict.get('tag_translation', '')
-                members = member_dict.get('members', [])
-                
-                if not isinstance(members, list):
-                    print(f"잘못된 members 형식 무시: {members}")
+                missing = accept(group, result)
+                if not missing:
                     continue
+                if len(missing) < len(group):
+                    retry.append(missing)
+                elif len(group) > 1:
+                    half = len(group) // 2
+                    retry += [group[:half], group[half:]]
+                else:
+                    dropped.extend(missing)
+            if len(retry) > self._rerequests_left:
+                print(f"재요청 상한({LLM_MAX_REREQUESTS}개)에 도달해 {len(retry) - self._rerequests_left}개 요청을 "
+                      f"보내지 않습니다.")
+                dropped.extend(chain.from_iterable(retry[self._rerequests_left:]))
+                retry = retry[:self._rerequests_left]
+            self._rerequests_left -= len(retry)
+            if retry:
+                print(f"응답에 빠진 항목을 다시 요청합니다: {sum(len(group) for group in retry)}개 "
+                      f"({len(retry)}개 요청)")
+            pending = retry
+        return dropped
 
-                for member in members:
-                    if isinstance(member, str):
-                        all_members_with_context.append({
-                            'member': member,
-                            'tag': tag_name,
-                            'tag_translation': tag_translation
-                        })
-                    else:
-                        print(f"잘못된 멤버 형식 무시: {member}")
+    async def _call_llm_batch_api(self, requests: list) -> list:
+        """요청들을 JSONL로 묶어 Batch API에 제출하고, 완료될 때까지 기다려 결과를 파싱합니다.
+
+        형식이 틀린 응답은 빈 dict, 실패하거나 응답을 받지 못한 요청은 None으로 채웁니다.
+        (_call_llm과 같은 규칙)
+        """
+        results = [None] * len(requests)
+        try:
+            lines = b"".join(
+                orjson.dumps({
+                    "custom_id": str(i),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._completion_body(
+                        [_system_message(system_msg), {"role": "user", "content": prompt}],
+                        max_tokens,
+                        schema
+                    )
+                }) + b"\n"
+                for i, (prompt, system_msg, max_tokens, schema) in enumerate(requests)
+            )
+            input_file = await self.aclient.files.create(
+                file=("translation_requests.jsonl", lines), purpose="batch"
+            )
+            batch = await self.aclient.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            print(f"Batch API 작업 제출: {batch.id} ({len(requests)}개 요청)")
             
-            except Exception as e:
-                print(f"멤버 정보 수집 중 오류: {str(e)}")
-                continue
-        
-        # 배치 단위로 처리
-        for i in range(0, len(all_members_with_context), BATCH_SIZE):
-            batch = all_members_with_context[i:i + BATCH_SIZE]
+            # 완료될 때까지 간격을 늘려가며 상태 확인
+            delay = BATCH_POLL_MIN_INTERVAL
+            while batch.status not in _BATCH_FINAL_STATUSES:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, BATCH_POLL_MAX_INTERVAL)
+                batch = await self.aclient.batches.retrieve(batch.id)
+                log.debug("Batch API 상태: %s %s", batch.id, batch.status)
             
-            members_prompt = """다음 재무제표의 세그먼트(부문) 및 멤버 이름들을 한국어로 번역해주세요.
+            # 만료/취소된 작업도 끝난 요청의 결과는 output 파일에 남아 있음
+            if not batch.output_file_id:
+                print(f"Batch API 작업 실패: {batch.id} ({batch.status})")
+                return results
+            output = await self.aclient.files.content(batch.output_file_id)
+            for line in output.content.splitlines():
+                row = orjson.loads(line)
+                response = row.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                content = response["body"]["choices"][0]["message"]["content"]
+                log.debug("LLM 원본 응답: %s", content)
+                i = int(row["custom_id"])
+                parsed = self._parse_llm_json(content, requests[i][3])
+                results[i] = parsed if parsed is not None else {}
+            print(f"Batch API 작업 완료: {batch.id} ({batch.status})")
+        except _FATAL_LLM_ERRORS as e:
+            self._set_fatal_error(e)
+            raise
+        except Exception as e:
+            print(f"Batch API 호출 중 오류: {str(e)}")
+            traceback.print_exc()
+        return results
 
-응답은 반드시 아래 JSON 형식으로 작성해주세요:
+    def _pending_members(self, tag_members: dict) -> tuple:
+        """번역이 필요한 멤버를 태그별로 모읍니다.
 
-<json>
-{
-    "translations": {
-        "member1": "번역1",
-        "member2": "번역2"
-    }
-}
-</json>
+        이미 번역된 멤버는 제외하고, 나머지는 stem 기준으로 한 번만 요청합니다.
+        (처음 등장한 멤버 표기와 그 멤버가 속한 태그 사용)
 
-번역 규칙:
-1. 세그먼트/부문 관련:
-   - XXXSegmentMember → "XX 부문"으로 번역 (예: AsiaSegmentMember → "아시아 부문")
-   - 지역 세그먼트는 일반적인 한국어 지역명 사용 (예: GreaterChina → "대중화권")
-   - Product/Service는 "제품"/"서비스"로 번역
+        Returns:
+            tuple: ({stem: 대표 멤버}, {태그: [요청할 멤버, ...]})
+        """
+        pending = {}
+        member_tag = {}
+        for tag, members in tag_members.items():
+            for member in members:
+                if not isinstance(member, str):
+                    log.debug("잘못된 멤버 형식 무시: %r", member)
+                    continue
+                if member not in self.member_translations_cache:
+                    stem = self._member_stem(member)
+                    if stem not in pending:
+                        pending[stem] = member
+                        member_tag[member] = tag
+        # 이전 실행에서 번역된 멤버는 영구 캐시에서 가져옴
+        uncached = self._load_cached_translations(
+            'member', list(pending.values()), self.member_translations_cache
+        )
+        pending_by_tag = {}
+        for member in uncached:
+            pending_by_tag.setdefault(member_tag[member], []).append(member)
+        return pending, pending_by_tag
 
-2. 일반 멤버 관련:
-   - Member 접미사는 번역하지 않고 제외
-   - 일반적인 재무용어는 한국 회계기준 용어 사용
-   - 제품명이나 브랜드명은 한국에서 통용되는 명칭 사용
+    def _share_member_translations(self, pending: dict, tag_members: dict) -> None:
+        """같은 stem의 다른 표기에는 LLM 호출 없이 번역을 공유합니다."""
+        stem_translations = {
+            stem: self.member_translations_cache[member]
+            for stem, member in pending.items()
+            if member in self.member_translations_cache
+        }
+        for members in tag_members.values():
+            for member in members:
+                if isinstance(member, str) and member not in self.member_translations_cache:
+                    stem = self._member_stem(member)
+                    if stem in stem_translations:
+                        self.member_translations_cache[member] = stem_translations[stem]
 
-3. 맥락 고려:
-   - 태그: {tag_name}
-   - 태그 번역: {tag_translation}
-   이 태그의 맥락을 고려하여 자연스러운 번역
+    def _merged_batches(self, tags: list, pending_tags: list, pending_members: dict) -> list:
+        """번역할 태그와 멤버를 LLM 호출 단위로 묶습니다.
 
-번역할 멤버 목록:
-"""
-            
-            # 각 멤버의 상세 정보 추가
-            for item in batch:
-                members_prompt += f"\n- {item['member']}"
-                members_prompt += f"\n  (태그: {item['tag']} → {item['tag_translation']})"
-            
-            # LLM을 통한 번역 수행
-            system_msg = "재무제표 세그먼트와 멤버 이름을 번역하는 전문가입니다. 한국 K-IFRS 기준의 용어를 사용합니다."
-            result = self._call_llm(members_prompt, system_msg)
-            
-            # 번역 결과 처리
-            if isinstance(result, dict) and 'translations' in result:
-                translations.update(result['translations'])
-            
-            print(f"배치 처리 완료: {len(batch)}개 멤버")
+        한 배치에는 태그가 최대 TAG_BATCH_SIZE개, 멤버가 최대 MEMBER_BATCH_SIZE개
+        들어갑니다. 태그 번역이 이미 있어도 멤버를 번역해야 하면 맥락으로 함께 넣습니다.
+
+        Returns:
+            list: [(번역할 태그 리스트, {태그: [번역할 멤버, ...]}), ...]
+        """
+        pending_tag_set = set(pending_tags)
+        batches = []
+        batch_tags, batch_members, batch_tag_set, n_members = [], {}, set(), 0
+        for tag in dict.fromkeys(tags):
+            members = pending_members.get(tag, [])
+            need_tag = tag in pending_tag_set
+            if not need_tag and not members:
+                continue
+            # 멤버가 많은 태그는 여러 배치로 나눔
+            for start in range(0, max(len(members), 1), MEMBER_BATCH_SIZE):
+                chunk = members[start:start + MEMBER_BATCH_SIZE]
+                if batch_tag_set and (len(batch_tag_set) >= TAG_BATCH_SIZE
+                                      or n_members + len(chunk) > MEMBER_BATCH_SIZE):
+                    batches.append((batch_tags, batch_members))
+                    batch_tags, batch_members, batch_tag_set, n_members = [], {}, set(), 0
+                batch_tag_set.add(tag)
+                if need_tag:
+                    batch_tags.append(tag)
+                    need_tag = False
+                if chunk:
+                    batch_members[tag] = chunk
+                    n_members += len(chunk)
+        if batch_tag_set:
+            batches.append((batch_tags, batch_members))
+        return batches
+
+    def _chunk_request(self, tags: list, tag_to_members: dict) -> tuple:
+        """태그 번역/중요도와 멤버 번역을 한 번에 요청하는 LLM 요청을 만듭니다.
+
+        태그마다 {"tag", "members"} 한 행으로 묶어 보내고, 행마다 결과 한 행을 받습니다.
+
+        Args:
+            tags (list): 번역할 태그
+            tag_to_members (dict): 태그별 번역할 멤버 (태그는 멤버 번역의 맥락으로도 사용)
+
+        Returns:
+            tuple: _call_llm_many에 넘길 (prompt, system_msg, max_tokens, schema)
+        """
+        request = {"tags": [
+            {"tag": tag, "members": tag_to_members.get(tag, [])}
+            for tag in dict.fromkeys(chain(tags, tag_to_members))
+        ]}
+        prompt = CHUNK_PROMPT + orjson.dumps(request).decode() + "\n"
         
-        print(f"전체 멤버 번역 완료: {len(translations)}개")
-        return translations
+        system_msg = SYS_CHUNK
+        # 응답에는 행마다 태그와 그 멤버 이름이 모두 다시 나옴
+        echoed = chain(
+            (row["tag"] for row in request["tags"]),
+            chain.from_iterable(row["members"] for row in request["tags"])
+        )
+        return prompt, system_msg, _output_token_budget(echoed, CHUNK_TOKENS_PER_ITEM), ChunkTranslations
+
+    @staticmethod
+    def _batch_items(batch_tags: list, batch_members: dict) -> list:
+        """배치를 (태그, None) / (태그, 멤버) 항목 리스트로 펼칩니다. (다시 요청할 때 나누는 단위)"""
+        return [(tag, None) for tag in batch_tags] + [
+            (tag, member) for tag, members in batch_members.items() for member in members
+        ]
+
+    def _chunk_items_request(self, items: list) -> tuple:
+        """_batch_items 항목 리스트로 _chunk_request 요청을 만듭니다."""
+        tags = []
+        tag_to_members = {}
+        for tag, member in items:
+            if member is None:
+                tags.append(tag)
+            else:
+                tag_to_members.setdefault(tag, []).append(member)
+        return self._chunk_request(tags, tag_to_members)
+
+    def _accept_chunk_result(self, items: list, result: dict, pending_vectors: dict) -> list:
+        """태그/멤버 통합 번역 응답을 캐시에 저장하고, 응답에 빠진 항목을 반환합니다."""
+        tag_result, member_result = self._parse_chunk_result(result)
+        new_tags, new_members, missing = {}, {}, []
+        for item in items:
+            tag, member = item
+            if member is None:
+                # 멤버 맥락으로만 넣은 태그(이미 번역됨)는 항목에 없으므로 결과를 버림
+                if tag in tag_result:
+                    new_tags[tag] = tag_result[tag]
+                else:
+                    missing.append(item)
+            elif member in member_result:
+                new_members[member] = member_result[member]
+            else:
+                missing.append(item)
+        self.tag_translations_cache.update(new_tags)
+        self._store_cached_translations('tag', new_tags)
+        self._add_semantic_entries(new_tags, pending_vectors)
+        self.member_translations_cache.update(new_members)
+        self._store_cached_translations('member', new_members)
+        log.debug("배치 번역 완료: 태그 %d개, 멤버 %d개 (빠진 항목 %d개)",
+                  len(new_tags), len(new_members), len(missing))
+        return missing
 
-    def _translate_batch(self, items: list) -> list:
+    def _parse_chunk_result(self, result: dict) -> tuple:
+        """_chunk_request 응답을 ({태그: {"korean_name", "importance"}}, {멤버: 번역})으로 나눕니다."""
+        tag_translations = result.get('tag_translations')
+        member_translations = result.get('member_translations')
+        return (
+            tag_translations if isinstance(tag_translations, dict) else {},
+            member_translations if isinstance(member_translations, dict) else {}
+        )
+
+    def _load_semantic_cache(self) -> None:
+        """저장된 태그 임베딩과 번역을 불러옵니다."""
         try:
-            # 태그 번역
-            tags = [item['concept'] for item in items]
-            tags_prompt = f"""다음 재무제표 항목들을 한국어로 번역하고 중요도 점수를 매겨주세요.
-
-응답은 반드시 아래 JSON 형식으로 작성해주세요:
-
-<json>
-{{
-    "translations": {{
-        "tag1": {{
-            "korean_name": "번역1",
-            "importance": 5  // 1-5 점수
-        }},
-        "tag2": {{
-            "korean_name": "번역2",
-            "importance": 3
-        }}
-    }}
-}}
-</json>
-투자자에게 중요한 정보가 될수록 높은 점수를 매겨겨 1~5점까지 중요도 점수를 메겨주세요.
+            embeddings = np.load(os.path.join(self.data_dir, TAG_EMBEDDINGS_FILE))
+            with open(os.path.join(self.data_dir, TAG_EMBEDDING_KEYS_FILE), 'rb') as f:
+                entries = orjson.loads(f.read())
+        except (OSError, ValueError):
+            return
+        if len(entries) == len(embeddings):
+            self._tag_embeddings = embeddings.astype(np.float32, copy=False)
+            self._tag_embedding_entries = entries
 
+    def _save_semantic_cache(self) -> None:
+        """태그 임베딩과 번역을 data_dir에 저장합니다."""
+        if self._tag_embeddings is None:
+            return
+        try:
+            np.save(os.path.join(self.data_dir, TAG_EMBEDDINGS_FILE), self._tag_embeddings)
+            with open(os.path.join(self.data_dir, TAG_EMBEDDING_KEYS_FILE), 'wb') as f:
+                f.write(orjson.dumps(self._tag_embedding_entries))
+        except OSError as e:
+            print(f"의미 캐시 저장 중 오류: {str(e)}")
 
-다음 규칙을 반드시 따라주세요:
-1. 한국 K-IFRS 기준의 공식 용어를 우선적으로 사용
-2. 공식 용어가 없는 경우, 한국 재무제표에서 일반적으로 사용되는 직관적인 용어로 번역
-3. 번역시 다음 용어들은 일관되게 사용:
-   - Revenue → 매출액
-   - Cost of Revenue/Sales → 매출원가
-   - Gross Profit → 매출총이익
-   - Operating Income/Loss → 영업이익/손실
-   - Net Income/Loss → 당기순이익/손실
-4. 번역문은 간단명료하게, 불필요한 설명이나 수식어 제외
-5. 기술적인 용어는 한국 투자자들이 이해하기 쉬운 용어로 번역
+    async def _embed_texts(self, texts: list) -> np.ndarray:
+        """텍스트들을 임베딩하고 L2 정규화한 (N, dim) float32 배열을 반환합니다."""
+        async def embed(batch):
+            # chat 호출과 같은 동시 요청 수 제한/RPM·TPM 한도/재시도를 거침 (입력만 있고 응답 토큰 없음)
+            async with self.sem:
+                return await self._request_with_retry(
+                    self.aclient.embeddings.create, sum(len(text) for text in batch) // 2,
+                    model=EMBEDDING_MODEL, input=batch
+                )
 
-번역할 태그:
-{', '.join(tags)}
-"""
-            
-            system_msg = "재무제표 용어를 번역하는 전문가입니다."
-            tag_translations_result = self._call_llm(tags_prompt, system_msg)
-            
-            # 응답 형식 검증 및 처리
-            tag_translations_dict = {}
-            if isinstance(tag_translations_result, dict):
-                translations = tag_translations_result.get('translations', {})
-                if isinstance(translations, dict):
-                    tag_translations_dict = translations
-            
-            # 태그별로 멤버 정보 수집
-            members_info = []
+        responses = await asyncio.gather(*(
+            embed(texts[i:i + EMBEDDING_BATCH_SIZE])
+            for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+        ))
+        vectors = np.asarray(
+            [item.embedding for response in responses for item in response.data],
+            dtype=np.float32
+        )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    async def _semantic_lookup(self, tags: list) -> tuple:
+        """의미가 거의 같은 기존 태그가 있으면 그 번역을 재사용합니다.
+
+        Returns:
+            tuple: (여전히 번역이 필요한 태그 목록, 해당 태그들의 임베딩 dict)
+        """
+        try:
+            vectors = await self._embed_texts(tags)
+        except Exception as e:
+            print(f"태그 임베딩 중 오류, 의미 캐시 없이 진행합니다: {str(e)}")
+            return tags, {}
+        
+        hits = {}
+        if self._tag_embeddings is not None and len(self._tag_embeddings):
+            # (새 태그 수, 기존 태그 수) 코사인 유사도를 행렬 곱 한 번으로 계산
+            scores = vectors @ self._tag_embeddings.T
+            best = scores.argmax(axis=1)
+            for i, tag in enumerate(tags):
+                if scores[i, best[i]] > SEMANTIC_CACHE_THRESHOLD:
+                    hits[tag] = self._tag_embedding_entries[best[i]]['translation']
+        
+        if hits:
+            self.tag_translations_cache.update(hits)
+            self._store_cached_translations('tag', hits)
+            print(f"의미 캐시 적중: {len(hits)}개 태그")
+        
+        misses = [tag for tag in tags if tag not in hits]
+        return misses, {tag: vectors[i] for i, tag in enumerate(tags) if tag not in hits}
+
+    def _add_semantic_entries(self, translations: dict, vectors: dict) -> None:
+        """새로 번역된 태그의 임베딩과 번역을 의미 캐시에 추가합니다."""
+        new_tags = [tag for tag in translations if tag in vectors]
+        if not new_tags:
+            return
+        new_vectors = np.stack([vectors[tag] for tag in new_tags])
+        if self._tag_embeddings is None or not len(self._tag_embeddings):
+            self._tag_embeddings = new_vectors
+        else:
+            self._tag_embeddings = np.vstack([self._tag_embeddings, new_vectors])
+        self._tag_embedding_entries.extend(
+            {'tag': tag, 'translation': translations[tag]} for tag in new_tags
+        )
+
+    async def _pending_tags(self, tags: list) -> tuple:
+        """중복을 제거하고 캐시에 없는 태그만 골라냅니다.
+
+        Returns:
+            tuple: (번역할 태그 리스트, 의미 캐시에 추가할 {태그: 임베딩})
+        """
+        pending = _unique_preserving_order(tag for tag in tags if tag not in self.tag_translations_cache)
+        # 이전 실행에서 번역된 태그는 영구 캐시에서 가져옴
+        pending = self._load_cached_translations('tag', pending, self.tag_translations_cache)
+        # 의미 캐시: 이름은 다르지만 의미가 같은 태그는 LLM 번역 없이 재사용
+        pending_vectors = {}
+        if self.semantic_cache and pending:
+            pending, pending_vectors = await self._semantic_lookup(pending)
+        return pending, pending_vectors
+
+    async def _translate_batch(self, items: list) -> list:
+        try:
+            # 태그 목록과 태그별 멤버를 항목을 한 번 순회하며 수집 (등장 순서 유지, 중복 제거)
+            tags = []
+            tag_members = {}
             for item in items:
-                tag_name = item['concept']
-                tag_translation = tag_translations_dict.get(tag_name, '')
-                
-                # 해당 태그의 모든 멤버 수집
-                members_set = set()
-                for data_point in item['data']:
-                    if data_point.get('멤버'):
-                        members_set.update(data_point['멤버'])
-                
-                if members_set:
-                    members_info.append({
-                        'tag_name': tag_name,
-                        'tag_translation': tag_translation,
-                        'members': list(members_set)
-                    })
+                tags.append(item['concept'])
+                members = tag_members.setdefault(item['concept'], {})
+                members.update(dict.fromkeys(chain.from_iterable(
+                    data_point.get('멤버') or () for data_point in item['data']
+                )))
             
-            # 멤버 배치 번역 수행
-            member_translations = {}
-            if members_info:
-                member_translations = self._translate_members_batch(members_info)
-                print(f"멤버 번역 완료: {len(member_translations)}개")
+            # 캐시에 없는 태그/멤버만 모아 태그와 멤버를 한 호출에서 함께 번역
+            pending_tags, pending_vectors = await self._pending_tags(tags)
+            member_stems, pending_members = self._pending_members(tag_members)
+            batches = self._merged_batches(tags, pending_tags, pending_members)
+            # 응답이 잘리거나 검증에 실패해 빠진 태그/멤버는 나눠서 다시 요청
+            dropped = await self._call_llm_until_complete(
+                [self._batch_items(batch_tags, batch_members) for batch_tags, batch_members in batches],
+                self._chunk_items_request,
+                partial(self._accept_chunk_result, pending_vectors=pending_vectors)
+            )
+            if batches:
+                print(f"배치 번역 완료: 태그 {len(pending_tags)}개, "
+                      f"멤버 {sum(len(members) for members in pending_members.values())}개 "
+                      f"({len(batches)}개 요청)")
+            if dropped:
+                dropped_tags = [tag for tag, member in dropped if member is None]
+                dropped_members = [member for tag, member in dropped if member is not None]
+                print(f"번역하지 못해 기본값을 사용합니다: 태그 {len(dropped_tags)}개, 멤버 {len(dropped_members)}개")
+                if dropped_tags:
+                    print(f"- 태그: {', '.join(dropped_tags)}")
+                if dropped_members:
+                    print(f"- 멤버: {', '.join(dropped_members)}")
+            if batches and pending_vectors:
+                self._save_semantic_cache()
+            self._share_member_translations(member_stems, tag_members)
             
             # 번역 결과 적용
             translated_items = []
+            tag_translation = self.tag_translations_cache.get
+            member_name = self.member_translations_cache.get
             for item in items:
                 tag_name = item['concept']
-                translation_info = tag_translations_dict.get(tag_name, {})
+                translation_info = tag_translation(tag_name, _EMPTY_TRANSLATION)
                 
                 translated_item = {
                     'section': item['section'],
@@ -390,181 +971,147 @@ class FinancialTranslator:
                         'korean_name': translation_info.get('korean_name', ''),
                         'importance': translation_info.get('importance', 1)  # 기본값 1
                     },
-                    'data': []
+                    # 필터링된 데이터 포인트 리스트를 그대로 사용 (포인트마다 dict를 복사하지 않음)
+                    'data': item['data']
                 }
                 
-                # 데이터 포인트 복사 및 멤버 번역 적용
+                # 멤버 번역 적용 (원본 hierarchy 데이터는 저장하지 않으므로 제자리에서 추가)
                 for data_point in item['data']:
-                    translated_point = data_point.copy()
                     if data_point.get('멤버'):
-                        translated_point['멤버_번역'] = [
-                            member_translations.get(member, member)
-                            for member in data_point['멤버']
+                        data_point['멤버_번역'] = [
+                            member_name(member, member) for member in data_point['멤버']
                         ]
-                    translated_item['data'].append(translated_point)
                 
                 translated_items.append(translated_item)
             
             return translated_items
         
+        except _FATAL_LLM_ERRORS:
+            # 기본값으로 채우지 않고 실행 전체를 중단 (translate_recent_statements에서 한 번 출력)
+            raise
         except Exception as e:
             print(f"배치 번역 중 오류: {str(e)}")
             traceback.print_exc()
             return []
 
-    def _translate_section_names_batch(self, sections: list) -> dict:
+    def _section_request(self, sections: list) -> tuple:
+        """섹션 이름 번역 요청 (_call_llm_many에 넘길 튜플)을 만듭니다."""
+        prompt = f"""재무제표 섹션 이름을 한국어로 번역해주세요.
+
+다음 규칙을 반드시 따라주세요:
+1. 한국 재무제표에서 일반적으로 사용되는 용어를 사용하여 번역
+2. 번역문은 간단명료하게 작성
+3. 불필요한 설명이나 수식어는 제외
+
+번역할 섹션 이름:
+{', '.join(sections)}
+"""
+        return prompt, SYS_SECTIONS, _output_token_budget(sections, SECTION_TOKENS_PER_ITEM), SectionTranslations
+
+    def _accept_section_result(self, sections: list, response: dict) -> list:
+        """섹션 번역 응답을 캐시에 저장하고, 응답에 빠진 섹션을 반환합니다."""
+        translations = response.get('translations') if isinstance(response, dict) else None
+        if not isinstance(translations, dict):
+            translations = {}
+        new_translations = {
+            section: translations[section] for section in sections if section in translations
+        }
+        self.section_translations_cache.update(new_translations)
+        self._store_cached_translations('section', new_translations)
+        return [section for section in sections if section not in new_translations]
+
+    async def _translate_section_names_batch(self, sections: list) -> dict:
         """섹션 이름을 배치로 번역합니다."""
         if not sections:
             return {}
         
-        # 표준 섹션 매핑 (소문자로 통일)
-        standard_sections = {
-            'balance sheet': '재무상태표',
-            'statement of financial position': '재무상태표',
-            'income statement': '포괄손익계산서',
-            'statement of comprehensive income': '포괄손익계산서',
-            'profit and loss': '포괄손익계산서',
-            'cash flow': '현금흐름표',
-            'statement of cash flows': '현금흐름표'
-        }
-        
         # 먼저 표준 섹션 매핑 확인
         result = {}
         sections_to_translate = []
         for section in sections:
             section_lower = section.lower()
-            if section_lower in standard_sections:
-                result[section] = {'korean_name': standard_sections[section_lower]}
+            if section_lower in _STANDARD_SECTION_NAMES:
+                result[section] = {'korean_name': _STANDARD_SECTION_NAMES[section_lower]}
             else:
                 sections_to_translate.append(section)
         
-        # 나머지 섹션만 LLM으로 번역
-        if sections_to_translate:
-            prompt = f"""재무제표 섹션 이름을 한국어로 번역해주세요. 
-            응답은 반드시 아래 JSON 형식으로 작성해주세요:
-            
-            <json>
-            {{
-                "translations": {{
-                    "section1": "번역1",
-                    "section2": "번역2"
-                }}
-            }}
-            </json>
-            
-            다음 규칙을 반드시 따라주세요:
-            1. 한국 재무제표에서 일반적으로 사용되는 용어를 사용하여 번역
-            2. 번역문은 간단명료하게 작성
-            3. 불필요한 설명이나 수식어는 제외
-
-            번역할 섹션 이름:
-            {', '.join(sections_to_translate)}
-            """
-            
-            system_msg = "재무제표 섹션 이름을 한국어로 번역하는 전문가입니다."
-            response = self._call_llm(prompt, system_msg)
-            
-            # 응답 형식 검증 및 처리
-            if isinstance(response, dict):
-                translations = response.get('translations', {})
-                if isinstance(translations, dict):
-                    for section in sections_to_translate:
-                        result[section] = {
-                            'korean_name': translations.get(section, section)
-                        }
-        
-        return result
-
-    def _translate_section_name(self, section: str) -> str:
-        """섹션 이름 번역
-        첫 페이지는 번역하지 않고, 주요 재무제표는 표준 용어를 사용합니다.
-        """
-        # 첫 페이지 번역 제외
-        if "cover" in section.lower() or "first page" in section.lower():
-            return section
-        
-        # 주요 재무제표 표준 용어 매핑
-        standard_statements = {
-            "balance sheet": "재무상태표",
-            "statement of financial position": "재무상태표",
-            "income statement": "포괄손익계산서",
-            "statement of comprehensive income": "포괄손익계산서",
-            "profit and loss": "포괄손익계산서",
-            "cash flow": "현금흐름표",
-            "statement of cash flows": "현금흐름표"
-        }
-        
-        # 섹션 이름을 소문자로 변환하여 비교
-        section_lower = section.lower()
-        for eng, kor in standard_statements.items():
-            if eng in section_lower:
-                return kor
-            
-        # 그 외의 경우 LLM을 통한 번역
-        prompt = (
-            "다음 재무제표 섹션 이름을 한국어로 번역해주세요.\n"
-            "응답은 반드시 아래 JSON 형식으로 작성해주세요:\n\n"
-            "<json>\n"
-            "{\n"
-            '  "translation 섹션션": "번역된 이름"\n'
-            "}\n"
-            "</json>\n\n"
-            f"섹션 이름: {section}"
+        # 이번 실행이나 이전 실행(영구 캐시)에서 번역된 섹션은 다시 요청하지 않음
+        sections_to_translate = self._load_cached_translations(
+            'section',
+            [section for section in sections_to_translate if section not in self.section_translations_cache],
+            self.section_translations_cache
         )
         
-        system_msg = "재무제표 섹션 이름을 한국어로 번역하는 전문가입니다."
-        result = self._call_llm(prompt, system_msg)
+        # 나머지 섹션만 LLM으로 번역 (응답에 빠진 섹션은 다시 요청)
+        if sections_to_translate:
+            dropped = await self._call_llm_until_complete(
+                [sections_to_translate], self._section_request, self._accept_section_result
+            )
+            if dropped:
+                # 캐시하지 않고 원래 이름을 사용 (다음 실행에서 다시 요청)
+                print(f"섹션 번역 실패, 원래 이름을 사용합니다: {', '.join(dropped)}")
+        
+        for section in sections:
+            if section not in result and section in self.section_translations_cache:
+                result[section] = {'korean_name': self.section_translations_cache[section]}
         
-        return result.get('translation', section)
+        return result
 
-    def _filter_and_translate(self) -> dict:
-        filtered_data = {}
-        if not self.hierarchy_data:
-            print("계층 데이터가 없습니다.")
-            return filtered_data
+    def _collect_items_to_translate(self, latest_context_ids: frozenset) -> list:
+        """hierarchy.json에서 최신 컨텍스트의 데이터 포인트가 있는 항목을 모읍니다.
 
-        # 최신 컨텍스트 추출
-        latest_contexts = self._extract_latest_context()
-        latest_context_ids = {ctx['id'].strip().lower() for ctx in latest_contexts}
-        print(f"최신 컨텍스트 ID: {latest_context_ids}")
+        Args:
+            latest_context_ids (frozenset): 정규화(strip().lower())된 최신 컨텍스트 ID
 
+        Returns:
+            list: {'section', 'subsection', 'concept', 'data'} 항목 리스트 (데이터 포인트는 중복 제거)
+        """
         items_to_translate = []
+        # 원본 컨텍스트 ID → 최신 컨텍스트 여부
+        # (같은 ID가 데이터 포인트마다 반복되므로 strip().lower() 정규화는 ID당 한 번만)
+        is_latest_ref = {}
         
-        # 각 섹션을 순회
-        for section_key, section_value in self.hierarchy_data.items():
-            section_lists = list(section_value.values())
-            if not section_lists:
-                continue
-            
-            for section_list in section_lists:
+        # 각 섹션을 순회 (파일에서 한 섹션씩 스트리밍)
+        for section_key, section_value in self._iter_sections():
+            for section_list in section_value.values():
                 for item in section_list:
                     tag = item.get('concept')
                     if not tag or 'Abstract' in tag:
                         continue
 
-                    # 중복 제거를 위한 데이터 포인트 해시 세트
+                    # 중복 제거를 위한 데이터 포인트 해시 세트 (메서드 조회는 루프 밖에서 한 번)
                     unique_data_points = set()
+                    seen_add = unique_data_points.add
                     filtered_data_points = []
-                    
-                    for data_point in item.get('data', []):
-                        context_ref = data_point.get('컨텍스트', '').strip().lower()
-                        if context_ref in latest_context_ids:
-                            # 데이터 포인트를 해시 가능한 형태로 변환
-                            data_point_key = (
-                                data_point.get('값'),
-                                data_point.get('단위'),
-                                data_point.get('소수점'),
-                                data_point.get('컨텍스트'),
-                                tuple(data_point.get('축', [])),
-                                tuple(data_point.get('멤버', [])),
-                                data_point.get('기간', {}).get('start_date'),
-                                data_point.get('기간', {}).get('end_date')
-                            )
-                            
-                            # 중복되지 않은 데이터 포인트만 추가
-                            if data_point_key not in unique_data_points:
-                                unique_data_points.add(data_point_key)
-                                filtered_data_points.append(data_point)
+                    keep = filtered_data_points.append
+
+                    for data_point in item.get('data', ()):
+                        get = data_point.get
+                        context_ref = get('컨텍스트', '')
+                        is_latest = is_latest_ref.get(context_ref)
+                        if is_latest is None:
+                            is_latest = context_ref.strip().lower() in latest_context_ids
+                            is_latest_ref[context_ref] = is_latest
+                        if not is_latest:
+                            continue
+                        # 데이터 포인트를 해시 가능한 튜플로 변환 (기간 dict는 한 번만 조회)
+                        # hash() 정수만 저장하면 충돌 시 다른 값이 빠질 수 있으므로 튜플을 그대로 키로 사용
+                        period = get('기간') or _EMPTY_PERIOD
+                        data_point_key = (
+                            get('값'),
+                            get('단위'),
+                            get('소수점'),
+                            context_ref,
+                            tuple(get('축') or ()),
+                            tuple(get('멤버') or ()),
+                            period.get('start_date'),
+                            period.get('end_date')
+                        )
+
+                        # 중복되지 않은 데이터 포인트만 추가
+                        if data_point_key not in unique_data_points:
+                            seen_add(data_point_key)
+                            keep(data_point)
 
                     if filtered_data_points:
                         items_to_translate.append({
@@ -574,75 +1121,117 @@ class FinancialTranslator:
                             'data': filtered_data_points
                         })
 
+        return items_to_translate
+
+    async def _filter_and_translate(self) -> dict:
+        filtered_data = {}
+
+        # 최신 컨텍스트 추출 (파일 읽기/파싱은 스레드에서)
+        latest_contexts = await asyncio.to_thread(self._extract_latest_context)
+        # 루프 밖에서 한 번만 만드는 불변 집합 (데이터 포인트마다 O(1) 멤버십 검사)
+        latest_context_ids = frozenset(ctx['id'].strip().lower() for ctx in latest_contexts)
+        print(f"최신 컨텍스트 수: {len(latest_context_ids)}")
+        log.debug("최신 컨텍스트 ID: %s", latest_context_ids)
+        if not latest_context_ids:
+            # 일치할 컨텍스트가 없으면 계층 전체를 순회할 필요 없음
+            print("현재 조건에 맞는 번역 대상이 없습니다.")
+            return filtered_data
+
+        # 계층 파일을 읽고 필터링하는 동안 이벤트 루프가 막히지 않도록 스레드에서 실행
+        items_to_translate = await asyncio.to_thread(
+            self._collect_items_to_translate, latest_context_ids
+        )
+
         print(f"번역 대상 태그 수: {len(items_to_translate)}")
         if not items_to_translate:
             print("현재 조건에 맞는 번역 대상이 없습니다.")
             return filtered_data
 
-        # 섹션 이름 번역
+        # 섹션 이름 번역은 태그/멤버 번역과 독립적이므로 동시에 진행
+        # (태그/멤버는 _translate_batch 안에서 배치로 나눠 동시에 요청)
         sections = list({item['section'] for item in items_to_translate})
-        section_translations = self._translate_section_names_batch(sections)
+        section_translations, translated_items = await asyncio.gather(
+            self._translate_section_names_batch(sections),
+            self._translate_batch(items_to_translate)
+        )
         
-        # 배치 처리로 번역 수행
-        batch_size = 200
-        for i in range(0, len(items_to_translate), batch_size):
-            batch = items_to_translate[i:i + batch_size]
-            translated_batch = self._translate_batch(batch)
-            
-            for item in translated_batch:
-                # 섹션 이름 번역 적용
-                original_section = item['section']
-                translated_section = section_translations.get(original_section, {
-                    'korean_name': original_section
-                })
-                
-                section_key = translated_section['korean_name']
-                
-                if section_key not in filtered_data:
-                    filtered_data[section_key] = {}
-                    
-                subsection = item.get('subsection', "")
-                if subsection not in filtered_data[section_key]:
-                    filtered_data[section_key][subsection] = []
-                    
-                filtered_data[section_key][subsection].append({
-                    'tag': item['tag'],
-                    'translation': item['translation'],
-                    'data': item['data']
-                })
+        # 섹션 이름 번역은 섹션마다 한 번만 조회 (같은 문자열 객체를 키로 재사용)
+        section_names = {
+            section: section_translations.get(section, {'korean_name': section})['korean_name']
+            for section in sections
+        }
+        for item in translated_items:
+            section_key = section_names[item['section']]
+            subsection = item.get('subsection', "")
+            filtered_data.setdefault(section_key, {}).setdefault(subsection, []).append({
+                'tag': item['tag'],
+                'translation': item['translation'],
+                'data': item['data']
+            })
         
         return filtered_data
 
+    def _write_structured_data(self, data: dict) -> str:
+        """번역 결과를 structured_kr_data.json에 저장합니다.
+
+        섹션 단위로 직렬화해서 바로 쓰므로 전체 트리의 직렬화 결과를 한 번에 메모리에
+        올리지 않습니다. (출력은 전체를 OPT_INDENT_2로 한 번에 쓴 것과 같음)
+        임시 파일에 쓴 뒤 os.replace로 교체하므로, 읽는 쪽에서 쓰다 만 파일을 보지 않습니다.
+        """
+        output_file = os.path.join(self.data_dir, "structured_kr_data.json")
+        tmp_file = output_file + ".tmp"
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        with open(tmp_file, 'wb') as f:
+            if not data:
+                f.write(b"{}")
+            else:
+                f.write(b"{")
+                for i, (section, section_data) in enumerate(data.items()):
+                    f.write(b"\n  " if i == 0 else b",\n  ")
+                    f.write(orjson.dumps(section, option=option))
+                    f.write(b": ")
+                    # 최상위 키 아래에 오도록 섹션 내용을 한 단계 들여쓰기
+                    f.write(orjson.dumps(section_data, option=option).replace(b"\n", b"\n  "))
+                f.write(b"\n}")
+        os.replace(tmp_file, output_file)
+        return output_file
+
+    async def _run_filter_and_translate(self) -> dict:
+        """이벤트 루프 안에서 번역을 실행하고, 끝나면 클라이언트 연결을 정리합니다."""
+        self._llm_error = None
+        self._rerequests_left = LLM_MAX_REREQUESTS
+        try:
+            return await self._filter_and_translate()
+        finally:
+            await self._close_client()
+
     def translate_recent_statements(self) -> None:
         """전체 재무제표 번역을 실행합니다."""
         try:
             print("\n재무제표 번역 시작...")
-            # 캐시 초기화
-            self.tag_translations_cache = {}
-            self.member_translations_cache = {}
-            self.context_categories_cache = {}
-            self.section_translations_cache = {}
+            # 메모리 캐시는 비우지 않음 (영구 캐시와 같은 내용이라 다시 실행해도 그대로 재사용)
+            if self._cache_db is None:
+                self._cache_db = self._open_translation_cache()
             
-            self.hierarchy_data = self._load_hierarchy()
-            if not self.hierarchy_data:
+            file_path = self._hierarchy_file()
+            print(f"데이터 파일 경로: {file_path}")
+            if not os.path.exists(file_path):
+                print(f"파일이 존재하지 않습니다: {file_path}")
                 print("hierarchy 데이터 로드 실패")
-                output_file = f"{self.data_dir}/structured_kr_data.json"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump({}, f, ensure_ascii=False, indent=2)
+                self._write_structured_data({})
                 return
             
-            self.translated_data = self._filter_and_translate()
-            output_file = f"{self.data_dir}/structured_kr_data.json"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(self.translated_data, f, ensure_ascii=False, indent=2)
+            self.translated_data = asyncio.run(self._run_filter_and_translate())
+            output_file = self._write_structured_data(self.translated_data)
             print(f"\n번역 완료: {output_file}")
             print("\n번역 통계:")
             print(f"- 태그 번역 캐시: {len(self.tag_translations_cache)}개")
             print(f"- 멤버 번역 캐시: {len(self.member_translations_cache)}개")
-            print(f"- 맥락 분석 캐시: {len(self.context_categories_cache)}개")
             print(f"- 섹션 번역 캐시: {len(self.section_translations_cache)}개")
         except Exception as e:
             print(f"번역 실행 중 오류: {str(e)}")
+        finally:
+            self._close_translation_cache()
 
     def _extract_latest_context(self, context_file: str = "context_data.json") -> list:
         """
@@ -660,8 +1249,11 @@ class FinancialTranslator:
         """
         try:
             file_path = os.path.join(self.data_dir, context_file)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                contexts = json.load(f)
+            # 파일을 bytes로 한 번 더 복사하지 않고 매핑된 페이지를 바로 파싱
+            with open(file_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                    memoryview(mm) as view:
+                contexts = orjson.loads(view)
         except Exception as e:
             print(f"컨텍스트 파일 로드 오류: {str(e)}")
             return []
@@ -676,71 +1268,64 @@ class FinancialTranslator:
             elif ctype == "instant":
                 instant_contexts[ctx_id] = ctx_data
 
-        # 1) period 컨텍스트에서 start_date 집계
-        start_date_counter = Counter()
-        for ctx_id, data in period_contexts.items():
-            start_date_str = data.get("start_date")
-            if start_date_str:
-                start_date_counter[start_date_str] += 1
+        # period 날짜는 한 번만 datetime64 배열로 변환해서 아래 단계에서 같이 사용
+        period_ids = list(period_contexts)
+        period_starts = _parse_dates([period_contexts[cid].get("start_date") for cid in period_ids])
+        period_ends = _parse_dates([period_contexts[cid].get("end_date") for cid in period_ids])
+
+        # 1) period 컨텍스트에서 start_date 집계 (날짜로 변환되는 값만)
+        start_dates, start_counts = np.unique(period_starts[~np.isnat(period_starts)], return_counts=True)
 
         # 10번 이상 등장한 start_date만 추출
-        candidate_dates = [sd for sd, count in start_date_counter.items() if count >= 10]
-        if not candidate_dates:
+        candidate_dates_dt = start_dates[start_counts >= 10]
+        if not len(candidate_dates_dt):
             print("start_date가 10번 이상 반복되는 케이스가 없습니다.")
             return []
 
-        # 2) 가장 늦은 날짜(가장 뒤) start_date를 선택
-        candidate_dates_dt = [datetime.strptime(sd, "%Y-%m-%d") for sd in candidate_dates]
-        baseline_start_date_dt = max(candidate_dates_dt)  # 가장 늦은 start_date
-        baseline_start_date_str = baseline_start_date_dt.strftime("%Y-%m-%d")
+        # 2) 가장 늦은 날짜(가장 뒤) start_date를 선택 (np.unique 결과는 정렬되어 있음)
+        baseline_start_date_dt = candidate_dates_dt[-1]  # 가장 늦은 start_date
+        baseline_start_date_str = str(baseline_start_date_dt)
 
         # 3) 이 날짜를 가진 period 중 end_date가 가장 늦은 컨텍스트 찾기
-        baseline_periods = []
-        for ctx_id, data in period_contexts.items():
-            if data.get("start_date") == baseline_start_date_str:
-                baseline_periods.append((ctx_id, data))
-
-        if not baseline_periods:
+        baseline_idx = np.flatnonzero(period_starts == baseline_start_date_dt)
+        if not len(baseline_idx):
             print("해당 기준 start_date를 가진 period 컨텍스트가 없습니다.")
             return []
 
         # 여러 개일 경우 end_date가 가장 늦은 것을 기준으로 선택
-        def parse_end_date(ctx_data):
-            return datetime.strptime(ctx_data.get("end_date"), "%Y-%m-%d")
-        
-        baseline_period_id, baseline_period_data = max(
-            baseline_periods,
-            key=lambda x: parse_end_date(x[1])
-        )
+        baseline_end_dates = period_ends[baseline_idx]
+        if np.isnat(baseline_end_dates).all():
+            print("기준 period 컨텍스트의 end_date를 날짜로 변환할 수 없습니다.")
+            return []
+        # NaT는 가장 이른 날짜로 취급해서 argmax에서 제외
+        best = int(np.where(np.isnat(baseline_end_dates), np.datetime64('0001-01-01'), baseline_end_dates).argmax())
+        baseline_period_id = period_ids[baseline_idx[best]]
+        baseline_period_data = period_contexts[baseline_period_id]
 
         # 기준 구간 설정: [base_start, base_end + 10일]
-        base_start_dt = datetime.strptime(baseline_period_data["start_date"], "%Y-%m-%d")
-        base_end_dt = datetime.strptime(baseline_period_data["end_date"], "%Y-%m-%d")
-        extended_end_dt = base_end_dt + timedelta(days=10)
+        base_start_dt = baseline_start_date_dt
+        base_end_dt = baseline_end_dates[best]
+        extended_end_dt = base_end_dt + np.timedelta64(10, 'D')
 
         # 4) instant 타입 중 날짜가 위 구간 [base_start_dt, base_end_dt+10]에 포함되는 것 추출
-        included_instants = []
-        for ctx_id, data in instant_contexts.items():
-            try:
-                inst_dt = datetime.strptime(data["date"], "%Y-%m-%d")
-                if base_start_dt <= inst_dt <= extended_end_dt:
-                    included_instants.append(ctx_id)
-            except Exception as e:
-                print(f"instant 날짜 파싱 오류(컨텍스트 {ctx_id}): {str(e)}")
-                continue
+        instant_ids = list(instant_contexts)
+        instant_dates = _parse_dates([instant_contexts[cid].get("date") for cid in instant_ids])
+        instant_invalid = np.isnat(instant_dates)
+        instant_mask = ~instant_invalid & (instant_dates >= base_start_dt) & (instant_dates <= extended_end_dt)
+        included_instants = [instant_ids[i] for i in np.flatnonzero(instant_mask)]
+        if instant_invalid.any():
+            print(f"instant 날짜 파싱 오류: {int(instant_invalid.sum())}개 컨텍스트 제외")
 
         # 5) 기준 구간 안에 start_date 혹은 end_date가 걸치는 period 컨텍스트도 포함
-        included_periods = []
-        for ctx_id, data in period_contexts.items():
-            try:
-                sd_dt = datetime.strptime(data["start_date"], "%Y-%m-%d")
-                ed_dt = datetime.strptime(data["end_date"], "%Y-%m-%d")
-                # start_date나 end_date 중 하나라도 [base_start_dt, extended_end_dt]에 걸치면 포함
-                if (base_start_dt <= sd_dt <= extended_end_dt) or (base_start_dt <= ed_dt <= extended_end_dt):
-                    included_periods.append(ctx_id)
-            except Exception as e:
-                print(f"period 날짜 파싱 오류(컨텍스트 {ctx_id}): {str(e)}")
-                continue
+        period_invalid = np.isnat(period_starts) | np.isnat(period_ends)
+        # start_date나 end_date 중 하나라도 [base_start_dt, extended_end_dt]에 걸치면 포함
+        period_mask = ~period_invalid & (
+            ((period_starts >= base_start_dt) & (period_starts <= extended_end_dt))
+            | ((period_ends >= base_start_dt) & (period_ends <= extended_end_dt))
+        )
+        included_periods = [period_ids[i] for i in np.flatnonzero(period_mask)]
+        if period_invalid.any():
+            print(f"period 날짜 파싱 오류: {int(period_invalid.sum())}개 컨텍스트 제외")
 
         # 6) 최종 결과(중복 제거) -> dict 형태로 반환
         final_ids = set()
@@ -759,13 +1344,15 @@ class FinancialTranslator:
             latest_contexts.append(ctx_copy)
 
         print(f"[새로운 알고리즘] 선택된 컨텍스트 수: {len(latest_contexts)}")
-        print(f"기준 start_date: {baseline_start_date_str} (id: {baseline_period_id})")
-        print(f"기준 end_date: {baseline_period_data['end_date']} (+10일 확장)")
-        print(f"포함된 instant {len(included_instants)}개, period {len(included_periods)}개")
-        print(f"최종 포함된 ID들: {[c['id'] for c in latest_contexts]}")
+        log.debug("기준 start_date: %s (id: %s)", baseline_start_date_str, baseline_period_id)
+        log.debug("기준 end_date: %s (+10일 확장)", baseline_period_data['end_date'])
+        log.debug("포함된 instant %d개, period %d개", len(included_instants), len(included_periods))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("최종 포함된 ID들: %s", [c['id'] for c in latest_contexts])
 
         return latest_contexts
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     translator = FinancialTranslator(data_dir="path_to_your_data_directory")
     translator.translate_recent_statements() 
\ No newline at end of file
@@ -0,0 +1,65 @@
+from typing import List
+
+from pydantic import BaseModel, ConfigDict
+
+
+# OpenAI structured outputs(strict json_schema)는 임의의 키를 가진 객체를 허용하지 않으므로
+# 태그/멤버 이름을 키로 쓰는 대신 항목 리스트로 받고, to_result()에서 기존 dict 형태로 바꿉니다.
+
+class _StrictModel(BaseModel):
+    # strict 모드는 모든 객체에 additionalProperties: false가 필요
+    model_config = ConfigDict(extra='forbid')
+
+
+class MemberTranslation(_StrictModel):
+    member: str
+    korean_name: str
+
+
+class TagResult(_StrictModel):
+    """태그 한 행의 번역 결과 (태그 번역/중요도와 그 태그에 속한 멤버 번역)"""
+    tag: str
+    korean_name: str
+    importance: int  # 1-5 점수
+    members: List[MemberTranslation]
+
+
+class ChunkTranslations(_StrictModel):
+    """태그/멤버 통합 번역 응답 (요청의 태그 행마다 결과 한 행)"""
+    results: List[TagResult]
+
+    def to_result(self) -> dict:
+        return {
+            'tag_translations': {
+                r.tag: {'korean_name': r.korean_name, 'importance': r.importance}
+                for r in self.results
+            },
+            'member_translations': {
+                m.member: m.korean_name for r in self.results for m in r.members
+            }
+        }
+
+
+class SectionTranslation(_StrictModel):
+    section: str
+    korean_name: str
+
+
+class SectionTranslations(_StrictModel):
+    """섹션 이름 번역 응답"""
+    translations: List[SectionTranslation]
+
+    def to_result(self) -> dict:
+        return {'translations': {s.section: s.korean_name for s in self.translations}}
+
+
+def response_format(schema: type) -> dict:
+    """chat.completions의 response_format 값 (strict json_schema)"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": schema.__name__,
+            "schema": schema.model_json_schema(),
+            "strict": True
+        }
+    }
@@ -1,4 +1,5 @@
 import json
+import logging
 import os
 from sec_fetcher import SECFetcher
 from create_html import create_html_report
@@ -44,6 +45,9 @@ def main():
         print(f"\n=== 의 {year}년 {month}월 분기 보고서 ===")
         print(f"10-Q URL: {url}")
         
+        # 인스턴스/definition/presentation 파일 동시 다운로드
+        fetcher.prefetch_filing(url)
+        
         # XBRL 데이터 가져오기
         xbrl_data, soup = fetcher.get_xbrl_data(url)
         if xbrl_data and soup:
@@ -70,4 +74,6 @@ def main():
             create_html_report()
 
 if __name__ == "__main__":
+    # 상세 출력(LLM 프롬프트, 배치별 진행 상황 등)은 DEBUG 레벨로 바꾸면 볼 수 있음
+    logging.basicConfig(level=logging.INFO)
     main()
\ No newline at end of file
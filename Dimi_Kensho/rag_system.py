@@ -1,64 +1,301 @@
-from llama_index.core import VectorStoreIndex, Document, Settings
+from llama_index.core import VectorStoreIndex, Document, Settings, StorageContext, load_index_from_storage
+from llama_index.core.schema import MetadataMode
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.llms.openai import OpenAI
+from llama_index.vector_stores.faiss import FaissVectorStore
+import faiss
+import hashlib
+import ijson
 import json
 import os
+from functools import lru_cache
+import numpy as np
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def rag():
-    # JSON 파일 읽기
-    with open('Dimi_Kensho/data/structured_kr_data.json', 'r', encoding='utf-8') as f:
-        kr_data = json.load(f)
-    
-    # JSON 데이터를 문서로 변환
+DATA_FILE = 'Dimi_Kensho/data/structured_kr_data.json'
+PERSIST_DIR = 'Dimi_Kensho/data/vector_index'
+META_FILE = os.path.join(PERSIST_DIR, 'meta.json')
+QUERY_CACHE_FILE = os.path.join(PERSIST_DIR, 'query_cache.json')
+
+# FAISS IVF+PQ 설정 (학습 벡터가 충분할 때만 사용)
+IVF_NLIST = 64
+IVF_PQ_M = 16
+IVF_PQ_NBITS = 8
+IVF_NPROBE = 8
+# k-means 학습에 필요한 최소 벡터 수 (FAISS 권장: 중심점당 39개)
+IVF_MIN_TRAIN = max(IVF_NLIST, 1 << IVF_PQ_NBITS) * 39
+# 임베딩 모델 한 번 호출에 넣을 텍스트 수
+EMBED_BATCH_SIZE = 128
+# 한국어 임베딩 모델 (기본은 PyTorch로 실행)
+EMBED_MODEL_NAME = "jhgan/ko-sbert-nli"
+# ONNX Runtime으로 실행하려면 미리 내보내 저장해 둔 .onnx 파일 경로를 지정
+# (SentenceTransformer(..., backend="onnx")로 변환한 뒤 save_pretrained로 저장한 모델 디렉토리의
+#  onnx/ 아래 파일, 예: "Dimi_Kensho/models/ko-sbert-nli/onnx/model_qint8_avx512_vnni.onnx")
+# 허브의 jhgan/ko-sbert-nli에는 ONNX 파일이 없어 매번 변환하게 되므로 저장된 파일이 있을 때만 사용
+EMBED_ONNX_FILE = os.getenv("EMBED_ONNX_FILE")
+
+
+class SemanticQueryCache:
+    """질문 임베딩의 코사인 유사도로 이전 답변을 재사용하는 캐시"""
+
+    def __init__(self, cache_file: str, data_hash: str, threshold: float = 0.92):
+        """
+        Args:
+            cache_file (str): 데이터 해시와 답변을 저장할 JSON 파일 경로
+                (임베딩은 같은 이름의 .npy 파일에 따로 저장)
+            data_hash (str): 인덱스를 만든 데이터의 해시 (데이터가 바뀌면 캐시를 비움)
+            threshold (float): 캐시 적중으로 판단할 최소 코사인 유사도
+        """
+        self.cache_file = cache_file
+        self.embeddings_file = os.path.splitext(cache_file)[0] + '_embeddings.npy'
+        self.data_hash = data_hash
+        self.threshold = threshold
+        self.embeddings = None  # (N, dim) 정규화된 질문 임베딩
+        self.responses = []
+        self._load()
+
+    def _load(self):
+        # pickle은 로드 시 임의 코드를 실행할 수 있으므로 JSON과 .npy(allow_pickle=False)만 사용
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('data_hash') != self.data_hash or not cached.get('responses'):
+                return
+            embeddings = np.load(self.embeddings_file, allow_pickle=False)
+        except (OSError, ValueError):
+            return
+        # 두 파일이 어긋나 있으면 (저장 도중 중단 등) 캐시를 사용하지 않음
+        if embeddings.ndim != 2 or len(embeddings) != len(cached['responses']):
+            return
+        self.embeddings = embeddings.astype(np.float32, copy=False)
+        self.responses = list(cached['responses'])
+
+    def save(self):
+        if self.embeddings is None:
+            return
+        np.save(self.embeddings_file, self.embeddings, allow_pickle=False)
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'data_hash': self.data_hash,
+                'responses': self.responses
+            }, f, ensure_ascii=False)
+
+    @staticmethod
+    def _normalize(embedding):
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def lookup(self, embedding):
+        """가장 유사한 질문의 답변을 반환합니다. 임계값 미만이면 None."""
+        if self.embeddings is None:
+            return None
+        scores = self.embeddings @ self._normalize(embedding)
+        best = int(scores.argmax())
+        if scores[best] > self.threshold:
+            return self.responses[best]
+        return None
+
+    def add(self, embedding, response: str):
+        vec = self._normalize(embedding)[np.newaxis, :]
+        if self.embeddings is None:
+            self.embeddings = vec
+        else:
+            self.embeddings = np.vstack([self.embeddings, vec])
+        self.responses.append(response)
+
+
+def _file_hash(path):
+    """JSON 파일의 sha256 해시를 계산합니다."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _load_persisted_index(data_hash):
+    """저장된 인덱스가 현재 JSON과 같은 해시로 만들어졌으면 불러옵니다."""
+    try:
+        with open(META_FILE, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    # 데이터나 임베딩 백엔드가 바뀌었으면 다시 생성
+    if meta.get('data_hash') != data_hash or meta.get('embed_backend') != _embed_backend_id():
+        return None
+
+    try:
+        vector_store = FaissVectorStore.from_persist_dir(PERSIST_DIR)
+        _set_nprobe(vector_store.client)
+        storage_context = StorageContext.from_defaults(
+            vector_store=vector_store, persist_dir=PERSIST_DIR
+        )
+        return load_index_from_storage(storage_context)
+    except Exception as e:
+        print(f"저장된 인덱스 로드 실패, 다시 생성합니다: {str(e)}")
+        return None
+
+
+@lru_cache(maxsize=None)
+def _onnx_model():
+    """EMBED_ONNX_FILE이 있으면 (모델 디렉토리, 디렉토리 기준 .onnx 경로)를, 없으면 None을 반환합니다."""
+    if not EMBED_ONNX_FILE:
+        return None
+    onnx_file = os.path.abspath(EMBED_ONNX_FILE)
+    if not os.path.isfile(onnx_file):
+        print(f"ONNX 파일이 없어 PyTorch로 임베딩합니다: {EMBED_ONNX_FILE}")
+        return None
+    # save_pretrained는 변환한 파일을 <모델 디렉토리>/onnx/ 아래에 저장함
+    model_dir = os.path.dirname(os.path.dirname(onnx_file))
+    return model_dir, os.path.relpath(onnx_file, model_dir)
+
+
+def _embed_backend_id():
+    """인덱스 메타에 기록할 임베딩 백엔드 식별자"""
+    onnx_model = _onnx_model()
+    return f"onnx:{EMBED_ONNX_FILE}" if onnx_model else "torch"
+
+
+def _create_embed_model():
+    """한국어 임베딩 모델을 불러옵니다. (저장된 ONNX 파일이 있으면 ONNX Runtime, 없으면 PyTorch)"""
+    onnx_model = _onnx_model()
+    if onnx_model is None:
+        return HuggingFaceEmbedding(model_name=EMBED_MODEL_NAME, embed_batch_size=EMBED_BATCH_SIZE)
+    model_dir, file_name = onnx_model
+    return HuggingFaceEmbedding(
+        model_name=model_dir,
+        embed_batch_size=EMBED_BATCH_SIZE,
+        backend="onnx",
+        model_kwargs={'file_name': file_name}
+    )
+
+
+def _set_nprobe(faiss_index):
+    """IVF 인덱스면 검색 시 탐색할 클러스터 수를 설정합니다."""
+    try:
+        faiss.extract_index_ivf(faiss_index).nprobe = IVF_NPROBE
+    except RuntimeError:
+        pass  # IVF가 아닌 인덱스
+
+
+def _create_faiss_index(embeddings):
+    """임베딩 행렬로 FAISS 인덱스를 만듭니다.
+
+    벡터 수가 IVF+PQ 학습에 충분하면 IndexIVFPQ를, 아니면 차원별 min/max로
+    int8 양자화한 IndexScalarQuantizer(벡터당 dim 바이트)를 사용합니다.
+    """
+    dim = embeddings.shape[1]
+    if len(embeddings) < IVF_MIN_TRAIN or dim % IVF_PQ_M:
+        index = faiss.IndexScalarQuantizer(
+            dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(embeddings)
+        return index
+
+    quantizer = faiss.IndexFlatIP(dim)
+    index = faiss.IndexIVFPQ(
+        quantizer, dim, IVF_NLIST, IVF_PQ_M, IVF_PQ_NBITS, faiss.METRIC_INNER_PRODUCT
+    )
+    index.train(embeddings)
+    _set_nprobe(index)
+    return index
+
+
+def _build_index(documents):
+    """문서를 임베딩하고 FAISS 벡터 저장소 위에 인덱스를 만듭니다."""
+    nodes = Settings.node_parser.get_nodes_from_documents(documents)
+    texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+    # 전체 텍스트를 EMBED_BATCH_SIZE 단위로 묶어서 인코딩
+    embeddings = Settings.embed_model.get_text_embedding_batch(texts)
+    for node, embedding in zip(nodes, embeddings):
+        node.embedding = embedding
+
+    faiss_index = _create_faiss_index(np.asarray(embeddings, dtype=np.float32))
+    storage_context = StorageContext.from_defaults(
+        vector_store=FaissVectorStore(faiss_index=faiss_index)
+    )
+    # 임베딩이 이미 채워진 노드는 다시 임베딩하지 않음
+    return VectorStoreIndex(nodes, storage_context=storage_context)
+
+
+def _build_documents():
+    """structured_kr_data.json을 섹션 단위로 스트리밍하며 문서로 변환합니다."""
     documents = []
-    for section_name, section_data in kr_data.items():
-        # 섹션별 문서 생성
-        section_text = f"섹션: {section_name}\n"
-        
-        for group_name, items in section_data.items():
-            for item in items:
-                # 번역 정보 추가
-                translation = item.get('translation', {})
-                section_text += f"항목: {translation.get('korean_name', '')}\n"
-                section_text += f"설명: {translation.get('description', '')}\n"
-                section_text += f"카테고리: {translation.get('category', '')}\n"
-                
-                # 데이터 값 추가
-                if item.get('data'):
-                    for data in item['data']:
-                        section_text += f"값: {data.get('display_value', '')} {data.get('unit', '')}\n"
-                        section_text += f"컨텍스트: {data.get('context', '')}\n"
-                
-                section_text += "\n"
-        
-        documents.append(Document(text=section_text))
-    
+    with open(DATA_FILE, 'rb') as f:
+        # 최상위 객체의 (섹션, 데이터) 쌍을 하나씩 읽어 한 섹션만 메모리에 유지
+        for section_name, section_data in ijson.kvitems(f, ''):
+            documents.append(_section_document(section_name, section_data))
+    return documents
+
+
+def _section_document(section_name, section_data):
+    """섹션 하나를 Document로 변환합니다."""
+    # 섹션별 문서 생성 (줄 단위로 모아서 마지막에 한 번만 결합)
+    parts = [f"섹션: {section_name}"]
+
+    for group_name, items in section_data.items():
+        for item in items:
+            # 번역 정보 추가
+            translation = item.get('translation', {})
+            parts.append(f"항목: {translation.get('korean_name', '')}")
+            parts.append(f"설명: {translation.get('description', '')}")
+            parts.append(f"카테고리: {translation.get('category', '')}")
+
+            # 데이터 값 추가
+            if item.get('data'):
+                for data in item['data']:
+                    parts.append(f"값: {data.get('display_value', '')} {data.get('unit', '')}")
+                    parts.append(f"컨텍스트: {data.get('context', '')}")
+
+            parts.append("")
+
+    # 섹션 이름을 메타데이터로 두어 질의 시 메타데이터 필터링에 사용
+    return Document(text="\n".join(parts) + "\n", metadata={"section": section_name})
+
+
+def rag():
     # GPT-4 설정
     Settings.llm = OpenAI(
         model="gpt-4o-mini",
         temperature=0.1,
         api_key=os.getenv("OPENAI_API_KEY")
     )
-    
+
     # 한국어 임베딩 모델 설정
-    Settings.embed_model = HuggingFaceEmbedding(
-        model_name="jhgan/ko-sbert-nli"
-    )
-    
-    # 인덱스 생성
-    index = VectorStoreIndex.from_documents(documents)
-    
+    Settings.embed_model = _create_embed_model()
+
+    # 데이터가 바뀌지 않았으면 저장된 인덱스를 재사용
+    data_hash = _file_hash(DATA_FILE)
+    index = _load_persisted_index(data_hash)
+    if index is None:
+        # 인덱스 생성
+        index = _build_index(_build_documents())
+        # 인덱스 디렉토리는 저장소에 포함하지 않으므로 (.gitignore) 처음 실행 시 생성
+        os.makedirs(PERSIST_DIR, exist_ok=True)
+        index.storage_context.persist(persist_dir=PERSIST_DIR)
+        with open(META_FILE, 'w', encoding='utf-8') as f:
+            json.dump(
+                {'data_hash': data_hash, 'embed_backend': _embed_backend_id()},
+                f, ensure_ascii=False, indent=2
+            )
+        print(f"인덱스를 저장했습니다: {PERSIST_DIR}")
+    else:
+        print(f"저장된 인덱스를 불러왔습니다: {PERSIST_DIR}")
+
     # 쿼리 엔진 생성
     query_engine = index.as_query_engine(
         response_mode="compact",
         similarity_top_k=3
     )
-    
 
-    
+    # 비슷한 질문은 검색/LLM 호출 없이 캐시에서 답변
+    # (임베딩 백엔드가 바뀌면 저장된 질문 임베딩과 비교할 수 없으므로 키에 포함)
+    query_cache = SemanticQueryCache(QUERY_CACHE_FILE, f"{data_hash}:{_embed_backend_id()}")
+
     print("\nRAG 시스템 시작")
     q = 0
     while q == 0:
@@ -66,8 +303,13 @@ def rag():
         if question == "q":
             q = 1
             break
-        response = query_engine.query(question)
-        print(f"답변: {response.response}")
+        q_emb = Settings.embed_model.get_query_embedding(question)
+        answer = query_cache.lookup(q_emb)
+        if answer is None:
+            answer = query_engine.query(question).response
+            query_cache.add(q_emb, answer)
+            query_cache.save()
+        print(f"답변: {answer}")
 
 if __name__ == "__main__":
     rag()
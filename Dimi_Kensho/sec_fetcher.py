@@ -2,15 +2,101 @@ import requests
 from bs4 import BeautifulSoup
 import re
 import traceback
-import json
+import orjson
 from collections import defaultdict
+from functools import lru_cache
+import io
 import os
 import xml.etree.ElementTree as ET
+from lxml import etree
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import openai
 
+from utils import remove_namespace
+
+# XBRL linkbase / xlink 속성의 Clark 표기 이름
+_LINKBASE_NS = 'http://www.xbrl.org/2003/linkbase'
+_XLINK_NS = 'http://www.w3.org/1999/xlink'
+_PRESENTATION_LINK = f'{{{_LINKBASE_NS}}}presentationLink'
+_PRESENTATION_ARC = f'{{{_LINKBASE_NS}}}presentationArc'
+_LOC = f'{{{_LINKBASE_NS}}}loc'
+_XLINK_ROLE = f'{{{_XLINK_NS}}}role'
+_XLINK_LABEL = f'{{{_XLINK_NS}}}label'
+_XLINK_HREF = f'{{{_XLINK_NS}}}href'
+_XLINK_FROM = f'{{{_XLINK_NS}}}from'
+_XLINK_TO = f'{{{_XLINK_NS}}}to'
+
+# 기업별 커스텀 role 패턴 (검사 순서대로)
+_COMPANY_ROLE_PATTERNS = (
+    ('apple.com/role/', 'Apple'),
+    ('microsoft.com/role/', 'Microsoft'),
+    ('amazon.com/role/', 'Amazon'),
+    ('google.com/role/', 'Google'),
+    ('meta.com/role/', 'Meta'),
+    ('nvidia.com/role/', 'NVIDIA'),
+    ('/role/', 'Standard')  # 기본 패턴
+)
+_SECTION_SUFFIXES = ('Details', 'Information', 'Disclosure', 'Table', 'Policy')
+
+_CAMEL_WORD_RE = re.compile('[A-Z][^A-Z]*|[a-z]+')
+_DIGIT_SPLIT_RE = re.compile('[0-9]+|[^0-9]+')
+_NON_ALNUM_RE = re.compile('[^a-zA-Z0-9]')
+
+# 출력 JSON 파일 형식 (들여쓰기 2칸, 한글은 그대로 UTF-8로 저장)
+_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+
+def _clean_section_name(text):
+    """CamelCase 섹션 이름을 공백으로 구분된 단어로 변환합니다."""
+    # 1. 대문자로 시작하는 단어들 분리
+    words = _CAMEL_WORD_RE.findall(text)
+    
+    # 2. 숫자와 문자 사이에 공백 추가
+    processed_words = []
+    for word in words:
+        processed_words.extend(_DIGIT_SPLIT_RE.findall(word))
+    
+    # 3. 특수문자 제거 및 공백으로 변환
+    cleaned_words = [_NON_ALNUM_RE.sub(' ', word).strip() for word in processed_words]
+    
+    # 4. 빈 문자열 제거 및 단어 결합
+    return ' '.join(word for word in cleaned_words if word)
+
+
+@lru_cache(maxsize=8192)
+def _section_name_from_role(role):
+    """role URI에서 회사명 접두어가 붙은 섹션 이름을 만듭니다."""
+    # role에서 섹션 이름 추출
+    section = None
+    company = 'Standard'
+    role_lower = role.lower()
+    
+    for pattern, company_name in _COMPANY_ROLE_PATTERNS:
+        if pattern in role_lower:
+            section = role.split(pattern)[-1]
+            company = company_name
+            break
+    
+    if not section:
+        return 'Other'
+    
+    # 불필요한 접미사 제거
+    for suffix in _SECTION_SUFFIXES:
+        if section.endswith(suffix):
+            section = section[:-len(suffix)]
+    
+    section = _clean_section_name(section)
+    
+    # 회사명이 Standard가 아닌 경우 접두어로 추가
+    if company != 'Standard':
+        section = f"{company} - {section}"
+    
+    return section.strip()
+
 class SECFetcher:
     def __init__(self, user_agent, data_dir):
         self.headers = {
@@ -24,6 +110,11 @@ class SECFetcher:
         self.base_url = "https://www.sec.gov"
         self.last_request_time = 0
         self.last_llm_request = 0
+        # keep-alive 연결 재사용 및 미리 받아둔 문서 캐시
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self._rate_lock = threading.Lock()
+        self._documents = {}
 
     def _get(self, url: str) -> Optional[requests.Response]:
         """SEC 서버에 요청을 보내는 메서드 (rate limiting 적용)
@@ -35,14 +126,16 @@ class SECFetcher:
             Optional[requests.Response]: 응답 객체 또는 None (에러 발생 시)
         """
         # SEC rate limit (10 requests per second) 준수
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < 0.1:  # 100ms 대기
-            time.sleep(0.1 - time_since_last_request)
+        # 여러 스레드에서 호출되므로 요청 시점을 lock 안에서 예약
+        with self._rate_lock:
+            current_time = time.time()
+            time_since_last_request = current_time - self.last_request_time
+            if time_since_last_request < 0.1:  # 100ms 대기
+                time.sleep(0.1 - time_since_last_request)
+            self.last_request_time = time.time()
         
         try:
-            response = requests.get(url, headers=self.headers)
-            self.last_request_time = time.time()
+            response = self.session.get(url)
             
             if response.status_code == 200:
                 return response
@@ -54,6 +147,36 @@ class SECFetcher:
             print(f"Error fetching {url}: {str(e)}")
             return None
 
+    def _filing_file_url(self, url, suffix):
+        """10-Q 뷰어 URL에서 XBRL 파일 URL을 만듭니다. (suffix 예: '_htm.xml', '_def.xml')"""
+        base_url = url.split('ix?doc=/')[1]
+        return f"https://www.sec.gov/{base_url.replace('.htm', suffix)}"
+
+    def _fetch(self, url):
+        """미리 받아둔 문서가 있으면 재사용하고, 없으면 다운로드합니다."""
+        response = self._documents.pop(url, None)
+        if response is None:
+            response = self._get(url)
+        return response
+
+    def prefetch_filing(self, url):
+        """인스턴스/definition/presentation 파일을 동시에 다운로드해 둡니다.
+
+        이후 get_xbrl_data, get_custom_tags, create_hierarchy_json은
+        네트워크 대기 없이 캐시된 응답을 사용합니다.
+        미리 받기에 실패해도 중단하지 않으며, 받지 못한 파일은 각 메서드가 직접 다운로드합니다.
+        """
+        try:
+            doc_urls = [self._filing_file_url(url, suffix)
+                        for suffix in ('_htm.xml', '_def.xml', '_pre.xml')]
+            with ThreadPoolExecutor(max_workers=len(doc_urls)) as executor:
+                for doc_url, response in zip(doc_urls, executor.map(self._get, doc_urls)):
+                    if response is not None:
+                        self._documents[doc_url] = response
+        except Exception as e:
+            print(f"XBRL 파일 미리 받기 실패: {str(e)}")
+            traceback.print_exc()
+
     def get_latest_10q_url(self, cik):
         """특정 기업의 최신 10-Q 보고서 URL 찾기"""
         try:
@@ -102,15 +225,14 @@ class SECFetcher:
         """URL에서 XBRL 데이터 가져오기"""
         try:
             # URL에서 파일명 추출
-            base_url = url.split('ix?doc=/')[1]
-            xml_url = f"https://www.sec.gov/{base_url.replace('.htm', '_htm.xml')}"
+            xml_url = self._filing_file_url(url, '_htm.xml')
             
             print(f"\nXML 파일 다운로드 중: {xml_url}")
-            response = requests.get(xml_url, headers=self.headers)
+            response = self._fetch(xml_url)
             
-            if response.status_code != 200:
-                print(f"Error: XML 파일 접근 실패 (Status: {response.status_code})")
-                return None
+            if response is None:
+                print("Error: XML 파일 접근 실패")
+                return None, None
             
             # 두 가지 파서로 파싱
             soup = BeautifulSoup(response.content, 'lxml')  # 기본 데이터용
@@ -209,8 +331,8 @@ class SECFetcher:
             
             # 파일로 저장
             output_file = os.path.join(self.data_dir, 'xbrl_data.json')
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(dict(self.xbrl_data), f, indent=2, ensure_ascii=False)
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(dict(self.xbrl_data), option=_JSON_OPTIONS))
             
             return dict(self.xbrl_data), xml_soup
             
@@ -221,22 +343,22 @@ class SECFetcher:
     def get_custom_tags(self, url):
         """URL에서 커스텀 태그 정보 가져오기"""
         try:
-            base_url = url.split('ix?doc=/')[1]
-            def_url = f"https://www.sec.gov/{base_url.replace('.htm', '_def.xml')}"
+            def_url = self._filing_file_url(url, '_def.xml')
             
             print(f"\nDefinition 파일 다운로드 중: {def_url}")
-            response = requests.get(def_url, headers=self.headers)
+            response = self._fetch(def_url)
             
-            if response.status_code != 200:
-                print(f"Error: Definition 파일 접근 실패 (Status: {response.status_code})")
+            if response is None:
+                print("Error: Definition 파일 접근 실패")
                 return None
             
             # xml 파서 사용
             soup = BeautifulSoup(response.content, 'xml')
             
             # 커스텀 태그 수집
+            locs = soup.find_all('loc')
             self.custom_tags = {}
-            for loc in soup.find_all('loc'):
+            for loc in locs:
                 href = loc.get('xlink:href', '')
                 if 'aapl-' in href:  # 기업별 prefix 처리
                     tag_name = href.split('#aapl_')[1]
@@ -250,6 +372,15 @@ class SECFetcher:
                             'explicit_members': []
                         }
             
+            # label → 커스텀 태그 / loc href 색인
+            # (arc마다 전체 태그와 loc을 다시 훑지 않도록 한 번만 만듦, 순서는 문서 순서 유지)
+            tags_by_label = defaultdict(list)
+            for tag in self.custom_tags.values():
+                tags_by_label[tag['label']].append(tag)
+            hrefs_by_label = defaultdict(list)
+            for loc in locs:
+                hrefs_by_label[loc.get('xlink:label')].append(loc.get('xlink:href', ''))
+            
             # 축과 멤버 정보 추가
             for arc in soup.find_all('definitionArc'):
                 from_label = arc.get('xlink:from', '')
@@ -257,17 +388,14 @@ class SECFetcher:
                 arcrole = arc.get('xlink:arcrole', '')
                 
                 if 'dimension-domain' in arcrole or 'domain-member' in arcrole:
-                    for tag in self.custom_tags.values():
-                        if tag['label'] == from_label:
-                            # 축/멤버 관계 정보 저장
-                            for loc in soup.find_all('loc'):
-                                if loc.get('xlink:label') == to_label:
-                                    member_href = loc.get('xlink:href', '')
-                                    if ':' in member_href:
-                                        ns, member = member_href.split('#')[1].split('_')
-                                        tag['members'].append(member)
-                                        if member.endswith('Member'):
-                                            tag['explicit_members'].append(member)
+                    for tag in tags_by_label.get(from_label, ()):
+                        # 축/멤버 관계 정보 저장
+                        for member_href in hrefs_by_label.get(to_label, ()):
+                            if ':' in member_href:
+                                ns, member = member_href.split('#')[1].split('_')
+                                tag['members'].append(member)
+                                if member.endswith('Member'):
+                                    tag['explicit_members'].append(member)
             
             return self.custom_tags
             
@@ -443,23 +571,24 @@ class SECFetcher:
         
         try:
             # pre.xml URL 생성
-            base_url = url.split('ix?doc=/')[1]
-            pre_url = f"https://www.sec.gov/{base_url.replace('.htm', '_pre.xml')}"
+            pre_url = self._filing_file_url(url, '_pre.xml')
             
             print(f"\nPresentation 파일 다운로드 중: {pre_url}")
-            response = requests.get(pre_url, headers=self.headers)
+            response = self._fetch(pre_url)
             
-            if response.status_code != 200:
-                print(f"Error: Presentation 파일 접근 실패 (Status: {response.status_code})")
+            if response is None:
+                print("Error: Presentation 파일 접근 실패")
                 return None
             
-            # pre.xml 파싱 (xml 파서 사용)
-            pre_soup = BeautifulSoup(response.content, 'xml')
+            # pre.xml을 presentationLink 단위로 스트리밍 파싱 (lxml)
+            links = etree.iterparse(io.BytesIO(response.content), events=('end',),
+                                    tag=_PRESENTATION_LINK)
             
             # presentationLink 별로 처리
-            for link in pre_soup.find_all('link:presentationLink'):
-                section_name = self.get_section_name(link.get('xlink:role', ''))
+            for _, link in links:
+                section_name = self.get_section_name(link.get(_XLINK_ROLE, ''))
                 if not section_name:
+                    self._release_element(link)
                     continue
                 
                 if section_name not in hierarchy:
@@ -467,18 +596,18 @@ class SECFetcher:
                 
                 # 태그 매핑 정보 수집
                 tag_map = {}
-                for loc in link.find_all('link:loc'):
-                    label = loc.get('xlink:label')
-                    href = loc.get('xlink:href')
+                for loc in link.iter(_LOC):
+                    label = loc.get(_XLINK_LABEL)
+                    href = loc.get(_XLINK_HREF)
                     if href and '#' in href:
                         tag = href.split('#')[-1]
                         tag_map[label] = tag
                 
                 # 계층 구조 수집
                 current_section = hierarchy[section_name]
-                for arc in link.find_all('link:presentationArc'):
-                    from_label = arc.get('xlink:from')
-                    to_label = arc.get('xlink:to')
+                for arc in link.iter(_PRESENTATION_ARC):
+                    from_label = arc.get(_XLINK_FROM)
+                    to_label = arc.get(_XLINK_TO)
                     
                     if from_label in tag_map and to_label in tag_map:
                         from_tag = tag_map[from_label]
@@ -512,14 +641,17 @@ class SECFetcher:
                                 child_node['data'].append(data_point)
                         
                         current_section[from_tag].append(child_node)
+                
+                # 처리한 presentationLink는 메모리에서 해제
+                self._release_element(link)
             
             # 빈 섹션 제거
             hierarchy = {k: v for k, v in hierarchy.items() if v}
             
             # JSON 파일로 저장
             output_file = os.path.join(self.data_dir, 'hierarchy.json')
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(hierarchy, f, indent=2, ensure_ascii=False)
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(hierarchy, option=_JSON_OPTIONS))
             
             return hierarchy
             
@@ -528,6 +660,14 @@ class SECFetcher:
             traceback.print_exc()
             return None
 
+    @staticmethod
+    def _release_element(element):
+        """iterparse로 처리가 끝난 요소와 앞선 형제 요소들을 해제합니다."""
+        element.clear()
+        parent = element.getparent()
+        while element.getprevious() is not None:
+            del parent[0]
+
     def get_section_name(self, role):
         """role URI에서 섹션 이름 추출 및 정제
         
@@ -537,65 +677,7 @@ class SECFetcher:
         Returns:
             str: 정제된 섹션 이름
         """
-        # 기업별 커스텀 role 패턴
-        company_patterns = {
-            'apple.com/role/': 'Apple',
-            'microsoft.com/role/': 'Microsoft',
-            'amazon.com/role/': 'Amazon',
-            'google.com/role/': 'Google',
-            'meta.com/role/': 'Meta',
-            'nvidia.com/role/': 'NVIDIA',
-            '/role/': 'Standard'  # 기본 패턴
-        }
-        
-        # role에서 섹션 이름 추출
-        section = None
-        company = 'Standard'
-        
-        for pattern, company_name in company_patterns.items():
-            if pattern in role.lower():
-                section = role.split(pattern)[-1]
-                company = company_name
-                break
-        
-        if section:
-            # 불필요한 접미사 제거
-            suffixes = ['Details', 'Information', 'Disclosure', 'Table', 'Policy']
-            for suffix in suffixes:
-                if section.endswith(suffix):
-                    section = section[:-len(suffix)]
-            
-            # CamelCase를 공백으로 분리하고 정제
-            import re
-            
-            def clean_section_name(text):
-                # 1. 대문자로 시작하는 단어들 분리
-                words = re.findall('[A-Z][^A-Z]*|[a-z]+', text)
-                
-                # 2. 숫자와 문자 사이에 공백 추가
-                processed_words = []
-                for word in words:
-                    sub_words = re.findall('[0-9]+|[^0-9]+', word)
-                    processed_words.extend(sub_words)
-                
-                # 3. 특수문자 제거 및 공백으로 변환
-                cleaned_words = [re.sub('[^a-zA-Z0-9]', ' ', word).strip() 
-                               for word in processed_words]
-                
-                # 4. 빈 문자열 제거 및 단어 결합
-                final_words = [word for word in cleaned_words if word]
-                
-                return ' '.join(final_words)
-            
-            section = clean_section_name(section)
-            
-            # 회사명이 Standard가 아닌 경우 접두어로 추가
-            if company != 'Standard':
-                section = f"{company} - {section}"
-            
-            return section.strip()
-            
-        return 'Other'
+        return _section_name_from_role(role)
 
     def remove_namespace(self, tag):
         """태그에서 네임스페이스 제거 및 정제
@@ -606,32 +688,7 @@ class SECFetcher:
         Returns:
             str: 정제된 태그 이름
         """
-        # 네임스페이스 패턴 정의
-        ns_patterns = {
-            'standard': ['us-gaap', 'usgaap', 'us', 'gaap', 'dei', 'srt'],
-            'international': ['ifrs', 'country', 'currency'],
-            'other': ['invest', 'risk', 'ref', 'ecd']
-        }
-        
-        # 1. 콜론(:)으로 분리된 네임스페이스 처리
-        if ':' in tag:
-            ns, name = tag.split(':', 1)
-            return name.lower()
-        
-        # 2. 언더스코어(_)로 분리된 네임스페이스 처리
-        if '_' in tag:
-            parts = tag.split('_', 1)
-            for category, patterns in ns_patterns.items():
-                if parts[0].lower() in patterns:
-                    return parts[1].lower()
-        
-        # 3. 하이픈(-)으로 분리된 네임스페이스 처리
-        if '-' in tag:
-            parts = tag.split('-', 1)
-            if parts[0].lower() in ns_patterns['standard']:
-                return parts[1].lower()
-        
-        return tag.lower()
+        return remove_namespace(tag)
 
     
     def process_translation(self, data):
@@ -682,8 +739,8 @@ class SECFetcher:
             
             # 정제된 번역 결과 저장
             output_file = os.path.join(self.data_dir, 'processed_translation.json')
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(processed_data, f, indent=2, ensure_ascii=False)
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(processed_data, option=_JSON_OPTIONS))
             
             return processed_data
             
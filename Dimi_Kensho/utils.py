@@ -1,11 +1,54 @@
 import requests
 import json
+import orjson
 import re
 from bs4 import BeautifulSoup
 from collections import defaultdict
 import traceback
 import os
 from datetime import datetime
+from functools import lru_cache
+
+# remove_namespace에서 제거할 네임스페이스 접두어 (소문자)
+_STANDARD_NS_PREFIXES = frozenset({'us-gaap', 'usgaap', 'us', 'gaap', 'dei', 'srt'})
+_NS_PREFIXES = _STANDARD_NS_PREFIXES | frozenset({
+    'ifrs', 'country', 'currency',   # international
+    'invest', 'risk', 'ref', 'ecd'   # other
+})
+
+
+# 태그는 컨텍스트마다 반복되므로 전체 태그 종류를 담을 만큼 넉넉하게 캐시
+@lru_cache(maxsize=65536)
+def remove_namespace(tag):
+    """태그에서 네임스페이스 접두어를 제거하고 소문자로 반환합니다.
+
+    SECFetcher와 FinancialTranslator가 같이 사용합니다.
+
+    Args:
+        tag (str): 원본 태그 (예: 'us-gaap:Revenues', 'us-gaap_Revenues')
+
+    Returns:
+        str: 정제된 태그 이름 (예: 'revenues')
+    """
+    tag = tag.lower()
+    
+    # 1. 콜론(:)으로 분리된 네임스페이스 처리
+    prefix, sep, name = tag.partition(':')
+    if sep:
+        return name
+    
+    # 2. 언더스코어(_)로 분리된 네임스페이스 처리
+    prefix, sep, name = tag.partition('_')
+    if sep and prefix in _NS_PREFIXES:
+        return name
+    
+    # 3. 하이픈(-)으로 분리된 네임스페이스 처리 (표준 네임스페이스만)
+    prefix, sep, name = tag.partition('-')
+    if sep and prefix in _STANDARD_NS_PREFIXES:
+        return name
+    
+    return tag
+
 
 def get_cik_from_ticker(ticker):
     """
@@ -453,8 +496,8 @@ def create_context_period_mapping(sec_report_url: str, data_dir: str, output_fil
         # JSON 파일로 저장
         os.makedirs(data_dir, exist_ok=True)
         output_path = os.path.join(data_dir, output_file)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(sorted_contexts, f, ensure_ascii=False, indent=2)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(sorted_contexts, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
             
         print(f"\n컨텍스트 기간 정보가 저장되었습니다: {output_path}")
         print(f"총 {len(sorted_contexts)}개의 컨텍스트 기간 정보가 추출되었습니다.")